@@ -0,0 +1,234 @@
+"""Pre-aggregated statistics behind the "Understanding our Data" charts.
+
+``AnalyticsCube`` keeps, for the cleaned (weight-encoded) symptom data:
+
+* row counts per disease,
+* a disease x weight-value histogram (symptom weights per disease),
+* a symptom-column x weight-value histogram,
+* running sums and cross products for the symptom correlation matrix.
+
+All of them are additive, so appended rows are folded in with ``update``
+without revisiting old data. ``load_cube`` persists the cube next to the
+app and only streams the rows appended to dataset.csv since the last build.
+"""
+import json
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from artifacts import BASE_DIR
+from instrumentation import timed
+
+CUBE_VERSION = 2
+DEFAULT_CUBE_PATH = os.path.join(BASE_DIR, ".cache", "analytics_cube.npz")
+
+
+class AnalyticsCube:
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.n_rows = 0
+        self.diseases = []
+        self._disease_index = {}
+        k = len(self.columns)
+        self.disease_rows = np.zeros(0, dtype=np.int64)
+        self.disease_hist = np.zeros((0, 0), dtype=np.int64)
+        self.column_hist = np.zeros((k, 0), dtype=np.int64)
+        self.sums = np.zeros(k)
+        self.cross = np.zeros((k, k))
+
+    @classmethod
+    def from_frame(cls, df_cleaned):
+        cube = cls([c for c in df_cleaned.columns if c != 'Disease'])
+        cube.update(df_cleaned)
+        return cube
+
+    def _grow(self, n_diseases, n_values):
+        d = n_diseases - self.disease_hist.shape[0]
+        v = max(n_values - self.disease_hist.shape[1], 0)
+        if d > 0 or v > 0:
+            self.disease_rows = np.pad(self.disease_rows, (0, max(d, 0)))
+            self.disease_hist = np.pad(self.disease_hist, ((0, max(d, 0)), (0, v)))
+            self.column_hist = np.pad(self.column_hist, ((0, 0), (0, v)))
+
+    def update(self, df_cleaned):
+        """Fold the rows of a cleaned frame (see cleaning.clean_data) into the cube."""
+        if len(df_cleaned) == 0:
+            return self
+        values = df_cleaned[self.columns].to_numpy(dtype=np.int64)
+        if values.min() < 0:
+            raise ValueError("symptom weights must be non-negative")
+
+        codes, uniques = pd.factorize(df_cleaned['Disease'])
+        for disease in uniques:
+            if disease not in self._disease_index:
+                self._disease_index[disease] = len(self.diseases)
+                self.diseases.append(disease)
+        disease_idx = np.array([self._disease_index[d] for d in uniques], dtype=np.int64)[codes]
+
+        self._grow(len(self.diseases), int(values.max()) + 1)
+        n_diseases, n_values = self.disease_hist.shape
+        k = len(self.columns)
+
+        self.disease_rows += np.bincount(disease_idx, minlength=n_diseases)
+        self.disease_hist += np.bincount((disease_idx[:, None] * n_values + values).ravel(),
+                                         minlength=n_diseases * n_values).reshape(n_diseases, n_values)
+        self.column_hist += np.bincount((np.arange(k) * n_values + values).ravel(),
+                                        minlength=k * n_values).reshape(k, n_values)
+        as_float = values.astype(np.float64)
+        self.sums += as_float.sum(axis=0)
+        self.cross += as_float.T @ as_float
+        self.n_rows += len(values)
+        return self
+
+    # -- derived views used by the charts ---------------------------------
+
+    def value_counts(self):
+        # same as stacking every symptom cell and calling value_counts()
+        counts = pd.Series(self.column_hist.sum(axis=0), name='count')
+        return counts[counts > 0].sort_values(ascending=False)
+
+    def disease_counts(self):
+        counts = pd.Series(self.disease_rows, index=pd.Index(self.diseases, name='Disease'),
+                           name='count')
+        return counts.sort_values(ascending=False)
+
+    def corr(self):
+        n = self.n_rows
+        cov = (self.cross - np.outer(self.sums, self.sums) / n) / (n - 1)
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(std, std)
+        corr = np.clip(corr, -1, 1)
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def disease_box_stats(self):
+        """Box-plot summary of symptom weights per disease, from the histograms.
+
+        Quartiles use linear interpolation (plotly's default) and the whiskers
+        reach the most extreme values within 1.5 IQR of the box.
+        """
+        weights = np.arange(self.disease_hist.shape[1])
+        stats = []
+        for disease, hist in zip(self.diseases, self.disease_hist):
+            q1, median, q3 = (_histogram_quantile(weights, hist, q) for q in (0.25, 0.5, 0.75))
+            present = weights[hist > 0]
+            iqr = q3 - q1
+            stats.append({
+                'Disease': disease,
+                'q1': q1, 'median': median, 'q3': q3,
+                'lowerfence': present[present >= q1 - 1.5 * iqr].min(),
+                'upperfence': present[present <= q3 + 1.5 * iqr].max(),
+                'mean': (weights * hist).sum() / hist.sum(),
+                'n': int(hist.sum()),
+            })
+        return pd.DataFrame(stats)
+
+    # -- persistence -------------------------------------------------------
+
+    def to_arrays(self):
+        return {
+            'columns': np.array(self.columns, dtype=str),
+            'diseases': np.array(self.diseases, dtype=str),
+            'n_rows': np.array(self.n_rows),
+            'disease_rows': self.disease_rows,
+            'disease_hist': self.disease_hist,
+            'column_hist': self.column_hist,
+            'sums': self.sums,
+            'cross': self.cross,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        cube = cls(arrays['columns'].tolist())
+        cube.diseases = arrays['diseases'].tolist()
+        cube._disease_index = {d: i for i, d in enumerate(cube.diseases)}
+        cube.n_rows = int(arrays['n_rows'])
+        for name in ('disease_rows', 'disease_hist', 'column_hist', 'sums', 'cross'):
+            setattr(cube, name, np.array(arrays[name]))
+        return cube
+
+
+def _histogram_quantile(values, counts, q):
+    # np.percentile(..., method='linear') over the expanded histogram
+    cumulative = np.cumsum(counts)
+    position = q * (cumulative[-1] - 1)
+    lower, upper = int(np.floor(position)), int(np.ceil(position))
+    below = values[np.searchsorted(cumulative, lower, side='right')]
+    above = values[np.searchsorted(cumulative, upper, side='right')]
+    return below + (above - below) * (position - lower)
+
+
+def _save(cube, meta, cache_path):
+    cache_dir = os.path.dirname(os.path.abspath(cache_path))
+    os.makedirs(cache_dir, exist_ok=True)
+    # a private temp file per writer, so app processes sharing the cache
+    # never interleave their writes
+    fd, tmp_path = tempfile.mkstemp(prefix=".analytics_cube.", suffix=".npz", dir=cache_dir)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), **cube.to_arrays())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _load(cache_path):
+    try:
+        with np.load(cache_path, allow_pickle=False) as arrays:
+            meta = json.loads(str(arrays['meta']))
+            if meta.get('version') != CUBE_VERSION:
+                return None, None
+            return AnalyticsCube.from_arrays(arrays), meta
+    except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+        # missing, truncated or corrupt: rebuild
+        return None, None
+
+
+@timed("load_cube")
+def load_cube(dataset_path, severity_path, cache_path=DEFAULT_CUBE_PATH, chunksize=None):
+    """Return the cube for ``dataset_path``, building or extending the saved one.
+
+    The saved cube is reused when Symptom-severity.csv is unchanged and
+    the first ``offset`` bytes of dataset.csv hash to what was seen last
+    time; only the rows after that offset are streamed, cleaned and added.
+    Anything else (edited rows, new weights, truncation) triggers a rebuild.
+    Both paths read the CSV in chunks (see ingest.py).
+    """
+    from ingest import DEFAULT_CHUNKSIZE, complete_lines_end, file_digest, ingest_to_cube
+
+    chunksize = chunksize or DEFAULT_CHUNKSIZE
+    df_weights = pd.read_csv(severity_path)
+    severity_digest = file_digest(severity_path)
+    size = os.path.getsize(dataset_path)
+
+    cube, meta = _load(cache_path)
+    reusable = (cube is not None
+                and meta['severity_digest'] == severity_digest
+                and size >= meta['offset']
+                and file_digest(dataset_path, meta['offset']) == meta['prefix_digest'])
+
+    if reusable:
+        end = complete_lines_end(dataset_path, meta['offset'])
+        if end == meta['offset']:
+            return cube
+        ingest_to_cube(dataset_path, df_weights, chunksize, cube=cube,
+                       offset=meta['offset'], end=end, names=meta['header'])
+    else:
+        end = complete_lines_end(dataset_path)
+        header = list(pd.read_csv(dataset_path, nrows=0).columns)
+        cube = ingest_to_cube(dataset_path, df_weights, chunksize, end=end)
+        if cube is None:
+            cube = AnalyticsCube([c for c in header if c != 'Disease'])
+        meta = {'version': CUBE_VERSION, 'header': header}
+
+    meta['offset'] = end
+    meta['prefix_digest'] = file_digest(dataset_path, end)
+    meta['severity_digest'] = severity_digest
+    _save(cube, meta, cache_path)
+    return cube
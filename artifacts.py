@@ -0,0 +1,84 @@
+import hashlib
+import io
+import json
+import os
+import time
+import warnings
+from typing import NamedTuple
+
+from instrumentation import timed
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PICKLE_DIR = os.path.join(BASE_DIR, "pickle files")
+
+ARTIFACT_FILES = {
+    "model": "model.pkl",
+    "symptom_encoders": "symptom_encoder.pkl",
+    "disease_encoder": "disease_encoder.pkl",
+    "X_columns": "X_column.pkl",
+}
+# moved into place first by train.py, with the sha1 of each pickle in "files"
+VERSION_FILE = "artifacts_version.json"
+LOAD_ATTEMPTS = 5
+
+
+class ModelBundle(NamedTuple):
+    model: object
+    symptom_encoders: dict
+    disease_encoder: object
+    X_columns: object
+
+
+def artifact_paths(pickle_dir=PICKLE_DIR):
+    return [os.path.join(pickle_dir, name) for name in ARTIFACT_FILES.values()]
+
+
+def file_signature(*paths):
+    # (mtime, size, inode) per file; replacing a file with os.replace or a
+    # fresh copy changes at least one of them
+    signature = []
+    for path in paths:
+        stat = os.stat(path)
+        signature.append((path, stat.st_mtime_ns, stat.st_size, stat.st_ino))
+    return tuple(signature)
+
+
+def _read_stamp(pickle_dir):
+    # (per-pickle sha1s, stamp mtime)
+    try:
+        with open(os.path.join(pickle_dir, VERSION_FILE)) as f:
+            return json.load(f).get("files"), os.fstat(f.fileno()).st_mtime_ns
+    except (OSError, ValueError):
+        return None, None  # hand-made pickles (like the shipped ones) have no stamp
+
+
+@timed("load_artifacts")
+def load_artifacts(pickle_dir=PICKLE_DIR):
+    """Load the four pickles as one consistent set.
+
+    train.py moves the version stamp into place first and then replaces the
+    pickles one by one, all of them written before the stamp. So while a
+    swap is in progress the stamp is newer than every pickle and the set is
+    re-read. Pickles newer than a mismatching stamp were written by something
+    else (e.g. the notebook); the stamp is stale and is ignored with a warning.
+    """
+    import joblib  # pulls in numpy; deferred until a model is actually needed
+
+    for attempt in range(LOAD_ATTEMPTS):
+        expected, stamp_mtime = _read_stamp(pickle_dir)
+        blobs, newest = {}, 0
+        for field, name in ARTIFACT_FILES.items():
+            with open(os.path.join(pickle_dir, name), "rb") as f:
+                blobs[field] = f.read()
+                newest = max(newest, os.fstat(f.fileno()).st_mtime_ns)
+        consistent = expected is None or all(hashlib.sha1(blobs[field]).hexdigest() == expected.get(name)
+                                             for field, name in ARTIFACT_FILES.items())
+        if not consistent and newest > stamp_mtime:
+            warnings.warn(f"{VERSION_FILE} in {pickle_dir} is older than the pickles and does not "
+                          "match them; ignoring it (delete it or rerun train.py to refresh it)")
+            consistent = True
+        if consistent:
+            return ModelBundle(**{field: joblib.load(io.BytesIO(blob)) for field, blob in blobs.items()})
+        time.sleep(0.1 * (attempt + 1))
+    raise RuntimeError(f"pickles in {pickle_dir} do not match {VERSION_FILE}; "
+                       "is a training run still writing them? (delete it if one was interrupted)")
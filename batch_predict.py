@@ -0,0 +1,157 @@
+"""Score symptom records in bulk with the Self-Diagnosis model.
+
+Streams a CSV or Parquet file laid out like dataset.csv in chunks, encodes
+each chunk with the precompiled symptom encoder table, runs one
+``model.predict`` per chunk and appends a ``Predicted_Disease`` column to the
+output as it goes, so memory stays bounded by the chunk size::
+
+    python batch_predict.py intake.csv predictions.csv --chunksize 50000 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from artifacts import PICKLE_DIR
+from inference import MISSING_LABEL
+from model_bundle import open_predictor
+
+PREDICTION_COLUMN = "Predicted_Disease"
+DEFAULT_CHUNKSIZE = 50_000
+
+_worker_predictor = None
+
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in (".parquet", ".pq")
+
+
+def read_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize, dtype=object)
+
+
+class ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = _is_parquet(path)
+        self._writer = None
+        self._schema = None
+        self._header = True
+
+    def write(self, chunk):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._writer is None:
+                # every column is text; inferring the schema per chunk would type a
+                # column that is empty in the first chunk (e.g. Symptom_17) as null
+                self._schema = pa.schema([(str(c), pa.string()) for c in chunk.columns])
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            self._writer.write_table(pa.Table.from_pandas(chunk, schema=self._schema,
+                                                          preserve_index=False))
+        else:
+            chunk.to_csv(self.path, mode="w" if self._header else "a",
+                         header=self._header, index=False)
+        self._header = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def score_chunk(chunk, predictor):
+    missing = [c for c in predictor.columns if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"input is missing symptom columns: {', '.join(missing)}")
+    chunk = chunk.copy()
+    # empty cells were encoded as the 'nan' class at training time, not as unknown
+    symptoms = chunk[predictor.columns].astype(object)
+    symptoms = symptoms.where(symptoms.notna(), MISSING_LABEL)
+    chunk[PREDICTION_COLUMN] = predictor.predict_many(symptoms.to_numpy())
+    return chunk
+
+
+def _init_worker(bundle_dir, pickle_dir):
+    global _worker_predictor
+    _worker_predictor = open_predictor(bundle_dir, pickle_dir)
+
+
+def _score_in_worker(chunk):
+    return score_chunk(chunk, _worker_predictor)
+
+
+def predict_file(input_path, output_path, chunksize=DEFAULT_CHUNKSIZE, workers=1,
+                 pickle_dir=PICKLE_DIR, bundle_dir=None):
+    """Score ``input_path`` into ``output_path`` and return the row count.
+
+    With ``workers > 1`` chunks are scored in a process pool; at most two
+    chunks per worker are in flight and results are written in input order.
+    Passing ``bundle_dir`` loads the memory-mapped model bundle instead of the
+    pickles, so the workers share one copy of the model arrays.
+    """
+    rows = 0
+    with ChunkWriter(output_path) as writer:
+        if workers <= 1:
+            predictor = open_predictor(bundle_dir, pickle_dir)
+            for chunk in read_chunks(input_path, chunksize):
+                writer.write(score_chunk(chunk, predictor))
+                rows += len(chunk)
+            return rows
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(bundle_dir, pickle_dir)) as pool:
+            pending = deque()
+            for chunk in read_chunks(input_path, chunksize):
+                pending.append(pool.submit(_score_in_worker, chunk))
+                if len(pending) >= 2 * workers:
+                    scored = pending.popleft().result()
+                    writer.write(scored)
+                    rows += len(scored)
+            while pending:
+                scored = pending.popleft().result()
+                writer.write(scored)
+                rows += len(scored)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="CSV or Parquet file with Symptom_1..Symptom_17 columns")
+    parser.add_argument("output", help="CSV or Parquet file to write (format from extension)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes to score chunks with (0 = all cores)")
+    parser.add_argument("--pickle-dir", default=PICKLE_DIR)
+    parser.add_argument("--bundle", help="memory-mapped model bundle directory (see model_bundle.py)")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    rows = predict_file(args.input, args.output, args.chunksize, workers, args.pickle_dir,
+                        args.bundle)
+    elapsed = time.perf_counter() - start
+    print(f"scored {rows} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Throughput and correctness check for batch_predict.py on dataset.csv.
+
+Scores dataset.csv with a small chunk size (so chunks differ in which
+symptom columns are empty) into CSV and Parquet, serially and with a
+process pool, checks that every run predicts the same diseases and reports
+accuracy against the ``Disease`` column, e.g.
+``python benchmarks/bench_batch_predict.py --chunksize 50 --workers 2``.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from batch_predict import PREDICTION_COLUMN, predict_file  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", default=os.path.join(ROOT, "dataset.csv"))
+    parser.add_argument("--chunksize", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args(argv)
+    warnings.filterwarnings("ignore")
+
+    expected = pd.read_csv(args.dataset, dtype=object)["Disease"].str.strip().to_numpy()
+    predictions = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for suffix in ("csv", "parquet"):
+            for workers in (1, args.workers):
+                out = os.path.join(tmp, f"scored_{workers}.{suffix}")
+                start = time.perf_counter()
+                rows = predict_file(args.dataset, out, args.chunksize, workers)
+                elapsed = time.perf_counter() - start
+                scored = pd.read_parquet(out) if suffix == "parquet" else pd.read_csv(out, dtype=object)
+                predicted = scored[PREDICTION_COLUMN].str.strip().to_numpy()
+                predictions[(suffix, workers)] = predicted
+                print(f"{suffix:<8} workers={workers}  {rows} rows in {elapsed:.2f}s  "
+                      f"accuracy {(predicted == expected).mean():.1%}")
+
+    reference = next(iter(predictions.values()))
+    if any((p != reference).any() for p in predictions.values()):
+        print("MISMATCH: runs disagree")
+        return 1
+    print("all runs agree")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
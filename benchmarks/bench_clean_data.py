@@ -0,0 +1,82 @@
+"""Scaling benchmark for cleaning.clean_data.
+
+Replicates dataset.csv N times in memory and times the cleaning pass,
+e.g. ``python benchmarks/bench_clean_data.py --scales 1 10 100 1000``
+(1000x is ~4.9M rows). Time per row should stay flat as the frame grows.
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from cleaning import clean_data  # noqa: E402
+
+
+def legacy_clean_data(df, df1):
+    # per-symptom boolean-mask loop that clean_data replaced
+    data = df[df.columns].values.flatten()
+    s = pd.Series(data).str.strip().values.reshape(df.shape)
+    df = pd.DataFrame(s, columns=df.columns).fillna(0)
+    vals = df.values
+    for symptom in df1['Symptom'].unique():
+        vals[vals == symptom] = df1[df1['Symptom'] == symptom]['weight'].values[0]
+    d = pd.DataFrame(vals, columns=df.columns)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', FutureWarning)
+        d = d.replace('dischromic _patches', 0)
+        d = d.replace('spotting_ urination', 0)
+        return d.replace('foul_smell_of urine', 0)
+
+
+def replicate(df, scale):
+    return pd.DataFrame(np.tile(df.to_numpy(dtype=object), (scale, 1)), columns=df.columns)
+
+
+def timeit(func, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--legacy-max-scale', type=int, default=1,
+                        help='also time the old loop up to this scale (0 disables)')
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(os.path.join(ROOT, 'dataset.csv'))
+    df1 = pd.read_csv(os.path.join(ROOT, 'Symptom-severity.csv'))
+
+    print(f"{'scale':>6} {'rows':>10} {'seconds':>10} {'ns/cell':>9} {'MB out':>8} {'legacy s':>9}")
+    for scale in args.scales:
+        frame = replicate(df, scale)
+        seconds, cleaned = timeit(clean_data, frame, df1, repeat=args.repeat)
+        cells = frame.shape[0] * (frame.shape[1] - 1)
+        out_mb = cleaned.drop(columns=['Disease']).memory_usage(index=False).sum() / 1e6
+
+        legacy = ''
+        if scale <= args.legacy_max_scale:
+            legacy_seconds, expected = timeit(legacy_clean_data, frame, df1, repeat=1)
+            symptom_cols = frame.columns[1:]
+            assert (cleaned[symptom_cols].to_numpy() == expected[symptom_cols].to_numpy(dtype=np.int64)).all()
+            assert (cleaned['Disease'] == expected['Disease']).all()
+            legacy = f'{legacy_seconds:.3f}'
+
+        print(f'{scale:>6} {len(frame):>10} {seconds:>10.3f} {seconds / cells * 1e9:>9.1f} '
+              f'{out_mb:>8.1f} {legacy:>9}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Per-prediction latency of predict_disease, before and after.
+
+Compares the old per-column ``Series.apply`` + ``LabelEncoder.transform``
+path with the precompiled lookup table in inference.Predictor, reports
+p50/p99 latency and checks both return the same disease, e.g.
+``python benchmarks/bench_predict.py --samples 2000``.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from artifacts import load_artifacts  # noqa: E402
+from inference import Predictor  # noqa: E402
+
+
+def legacy_predict_disease(symptoms, bundle):
+    model, symptom_encoders, disease_encoder, X_columns = bundle
+    new_data = pd.DataFrame([symptoms], columns=X_columns)
+    for column in new_data.columns:
+        if column in symptom_encoders:
+            encoder = symptom_encoders[column]
+            new_data[column] = new_data[column].apply(lambda x: encoder.transform([x])[0] if x in encoder.classes_ else -1)
+    predicted_label = model.predict(new_data)
+    return disease_encoder.inverse_transform(predicted_label)[0]
+
+
+def sample_inputs(bundle, samples, seed):
+    # mix of raw dataset rows (known labels) and UI-style picks (mostly unknown)
+    rng = random.Random(seed)
+    rows = pd.read_csv(os.path.join(ROOT, 'dataset.csv')).drop(columns=['Disease'])
+    rows = rows.astype(object).where(rows.notna(), 0).values.tolist()
+    vocabulary = sorted({cls.strip() for enc in bundle.symptom_encoders.values() for cls in enc.classes_})
+    inputs = []
+    for i in range(samples):
+        if i % 2:
+            inputs.append(rng.choice(rows))
+        else:
+            inputs.append([rng.choice(vocabulary) if rng.random() < 0.3 else 0
+                           for _ in bundle.X_columns])
+    return inputs
+
+
+def latencies(func, inputs):
+    times = np.empty(len(inputs))
+    results = []
+    for i, symptoms in enumerate(inputs):
+        start = time.perf_counter()
+        results.append(func(symptoms))
+        times[i] = time.perf_counter() - start
+    return times * 1e6, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--samples', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore', category=UserWarning)
+    bundle = load_artifacts()
+    predictor = Predictor(bundle)
+    inputs = sample_inputs(bundle, args.samples, args.seed)
+
+    # warm up both paths
+    legacy_predict_disease(inputs[0], bundle)
+    predictor.predict(inputs[0])
+
+    before, expected = latencies(lambda s: legacy_predict_disease(s, bundle), inputs)
+    after, actual = latencies(predictor.predict, inputs)
+    mismatches = sum(a != b for a, b in zip(actual, expected))
+
+    print(f"{'path':<8} {'p50 us':>9} {'p99 us':>9} {'mean us':>9}")
+    for name, times in (('before', before), ('after', after)):
+        p50, p99 = np.percentile(times, [50, 99])
+        print(f'{name:<8} {p50:>9.1f} {p99:>9.1f} {times.mean():>9.1f}')
+    print(f'mismatches: {mismatches}/{len(inputs)}')
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Throughput of inference_server against a local asyncio client.
+
+Starts the server in-process on a free port, drives it with concurrent
+keep-alive connections and checks every answer against Predictor.predict.
+Runs once without batching (max batch 1) and once with micro-batching,
+e.g. ``python benchmarks/bench_server.py --clients 32 --requests 50``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from artifacts import load_artifacts  # noqa: E402
+from inference import Predictor  # noqa: E402
+from inference_server import InferenceServer  # noqa: E402
+
+
+async def request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(port, inputs, expected):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    mismatches = 0
+    for symptoms, disease in zip(inputs, expected):
+        status, response = await request(reader, writer, "POST", "/predict", {"symptoms": symptoms})
+        mismatches += status != 200 or response["disease"] != disease
+    writer.close()
+    return mismatches
+
+
+async def run(predictor, inputs, expected, clients, max_batch_size, max_wait_ms):
+    server = InferenceServer(predictor, max_batch_size, max_wait_ms)
+    _, port = await server.start("127.0.0.1", 0)
+    try:
+        per_client = len(inputs) // clients
+        start = time.perf_counter()
+        mismatches = await asyncio.gather(*(
+            client(port, inputs[i * per_client:(i + 1) * per_client],
+                   expected[i * per_client:(i + 1) * per_client])
+            for i in range(clients)))
+        elapsed = time.perf_counter() - start
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        health_status, _ = await request(reader, writer, "GET", "/health")
+        _, metrics = await request(reader, writer, "GET", "/metrics")
+        writer.close()
+    finally:
+        await server.stop()
+    assert health_status == 200
+    return clients * per_client / elapsed, sum(mismatches), metrics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore", category=UserWarning)
+    predictor = Predictor(load_artifacts())
+    vocabulary = sorted(predictor.encoder_table.vocabulary)
+    rng = random.Random(0)
+    inputs = [[rng.choice(vocabulary) if rng.random() < 0.3 else 0 for _ in predictor.columns]
+              for _ in range(args.clients * args.requests)]
+    expected = [str(d) for d in predictor.predict_many(inputs)]
+
+    print(f"{'mode':<10} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'batch':>6} {'errors':>7}")
+    failed = False
+    for mode, batch_size in (("single", 1), ("batched", args.max_batch_size)):
+        rps, mismatches, metrics = asyncio.run(
+            run(predictor, inputs, expected, args.clients, batch_size, args.max_wait_ms))
+        failed |= bool(mismatches)
+        print(f"{mode:<10} {rps:>9.0f} {metrics['latency_p50_ms']:>8.2f} "
+              f"{metrics['latency_p99_ms']:>8.2f} {metrics['mean_batch_size']:>6.1f} {mismatches:>7}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Cold-start / time-to-first-paint of web_app.py per page.
+
+Each page is rendered once in a fresh interpreter through Streamlit's
+AppTest harness (the sidebar menu is patched to pick the page). Reports the
+time until the script run finishes and which heavy libraries it had to
+import, e.g. ``python benchmarks/bench_startup.py``. ``st.image`` is
+stubbed out (some of the media files are missing), so image encoding is
+not included. Point ``--app`` at another checkout's web_app.py to compare
+before/after.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["About", "Understanding our Data", "Self-Diagnosis"]
+HEAVY_MODULES = ["pandas", "sklearn", "plotly_express", "joblib"]
+
+CHILD = r"""
+import json, os, resource, sys, time, warnings
+start = time.perf_counter()
+warnings.filterwarnings("ignore")
+from unittest import mock
+import streamlit_option_menu
+from streamlit.testing.v1 import AppTest
+
+app, page, heavy = sys.argv[1], sys.argv[2], sys.argv[3].split(",")
+os.chdir(os.path.dirname(app))
+sys.path.insert(0, os.path.dirname(app))
+imported_before = set(sys.modules)
+import streamlit
+# some media files st.image points at are missing from the checkout; without
+# the stub the About page raises there and the rest of it is never timed
+with mock.patch.object(streamlit_option_menu, "option_menu", return_value=page), \
+        mock.patch.object(streamlit, "image"):
+    at = AppTest.from_file(app, default_timeout=300)
+    run_start = time.perf_counter()
+    at.run()
+    done = time.perf_counter()
+print(json.dumps({
+    "first_paint_s": done - start,
+    "script_run_s": done - run_start,
+    "imported": [m for m in heavy if m in sys.modules and m not in imported_before],
+    "exception": bool(at.exception),
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def measure(app, page):
+    output = subprocess.run([sys.executable, "-c", CHILD, app, page, ",".join(HEAVY_MODULES)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default=os.path.join(ROOT, "web_app.py"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    app = os.path.abspath(args.app)
+
+    print(f"{'page':<24} {'first paint s':>14} {'script run s':>13}  imported during run")
+    for page in PAGES:
+        runs = [measure(app, page) for _ in range(args.repeat)]
+        best = min(runs, key=lambda r: r["first_paint_s"])
+        note = " (page raised)" if best["exception"] else ""
+        print(f"{page:<24} {best['first_paint_s']:>14.2f} {best['script_run_s']:>13.2f}  "
+              f"{', '.join(best['imported']) or '-'}{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Headless benchmark suite for the web_app.py hot paths, with a stored baseline.
+
+Builds synthetic datasets by replicating and shuffling dataset.csv rows
+(1x, 10x, 100x by default) and runs every case in a fresh interpreter, so
+peak RSS belongs to that case alone. Per case it records the first and
+best wall time of ``--repeat`` runs, the process's peak RSS and the
+tracemalloc peak of one extra run, then compares them with
+``benchmarks/baseline.json``::
+
+    python benchmarks/suite.py                        # run and compare
+    python benchmarks/suite.py --cases clean_data predict_batch --scales 1 10
+    python benchmarks/suite.py --save-baseline        # accept the current numbers
+    python benchmarks/suite.py --check                # exit 1 on a regression
+
+Cold start goes through bench_startup.py (AppTest, real data, 1x only).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from artifacts import PICKLE_DIR, load_artifacts  # noqa: E402
+from ingest import peak_rss_mb  # noqa: E402
+from visualization import FIGURES  # noqa: E402
+
+DATASET_PATH = os.path.join(ROOT, "dataset.csv")
+SEVERITY_PATH = os.path.join(ROOT, "Symptom-severity.csv")
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+DEFAULT_DATA_DIR = os.path.join(ROOT, ".cache", "bench")
+DEFAULT_SCALES = [1, 10, 100]
+SINGLE_PREDICTIONS = 200
+METRIC_LABELS = {"wall_s": "wall", "peak_rss_mb": "rss", "alloc_peak_mb": "alloc"}
+
+# a case only reruns at every scale if its cost depends on the dataset size
+SCALED, FIXED = True, False
+
+
+def synthetic_dataset(scale, data_dir=DEFAULT_DATA_DIR, seed=0):
+    """dataset.csv replicated ``scale`` times in shuffled order, cached on disk."""
+    path = os.path.join(data_dir, f"dataset_x{scale}.csv")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        df = pd.read_csv(DATASET_PATH, dtype=str)
+        rows = np.random.default_rng(seed).permutation(len(df) * scale) % len(df)
+        df.iloc[rows].to_csv(f"{path}.tmp", index=False)
+        os.replace(f"{path}.tmp", path)
+    return path
+
+
+# -- cases: setup(dataset_path) returns a callable that reports items processed
+
+def _cleaned(dataset_path):
+    from cleaning import clean_data
+
+    return clean_data(pd.read_csv(dataset_path), pd.read_csv(SEVERITY_PATH))
+
+
+def setup_artifact_load(dataset_path):
+    def run():
+        load_artifacts(PICKLE_DIR)
+        return 1
+    return run
+
+
+def setup_clean_data(dataset_path):
+    from cleaning import clean_data
+
+    df, df_weights = pd.read_csv(dataset_path), pd.read_csv(SEVERITY_PATH)
+
+    def run():
+        return len(clean_data(df, df_weights))
+    return run
+
+
+def setup_cube(dataset_path):
+    from analytics import AnalyticsCube
+
+    df_cleaned = _cleaned(dataset_path)
+
+    def run():
+        return AnalyticsCube.from_frame(df_cleaned).n_rows
+    return run
+
+
+def setup_figure(name):
+    def setup(dataset_path):
+        from analytics import AnalyticsCube
+
+        cube = AnalyticsCube.from_frame(_cleaned(dataset_path))
+
+        def run():
+            FIGURES[name](cube)
+            return 1
+        return run
+    return setup
+
+
+def setup_visualize_data(dataset_path):
+    from visualization import visualize_data
+
+    df_cleaned = _cleaned(dataset_path)
+
+    def run():
+        return len(visualize_data(df_cleaned))
+    return run
+
+
+def _predictor_and_rows(dataset_path):
+    from inference import Predictor
+
+    predictor = Predictor(load_artifacts(PICKLE_DIR))
+    rows = pd.read_csv(dataset_path).drop(columns=["Disease"])
+    return predictor, rows.astype(object).where(rows.notna(), 0).values.tolist()
+
+
+def setup_predict_single(dataset_path):
+    predictor, rows = _predictor_and_rows(dataset_path)
+    rows = rows[:SINGLE_PREDICTIONS]
+
+    def run():
+        for symptoms in rows:
+            predictor.predict(symptoms)
+        return len(rows)
+    return run
+
+
+def setup_predict_batch(dataset_path):
+    predictor, rows = _predictor_and_rows(dataset_path)
+
+    def run():
+        return len(predictor.predict_many(rows))
+    return run
+
+
+CASES = {
+    "artifact_load": (FIXED, setup_artifact_load),
+    "clean_data": (SCALED, setup_clean_data),
+    "analytics_cube": (SCALED, setup_cube),
+    **{f"figure:{name}": (SCALED, setup_figure(name)) for name in FIGURES},
+    "visualize_data": (SCALED, setup_visualize_data),
+    "predict_single": (FIXED, setup_predict_single),
+    "predict_batch": (SCALED, setup_predict_batch),
+}
+COLD_START_PAGES = ["About", "Understanding our Data", "Self-Diagnosis"]
+
+
+def run_case(name, dataset_path, repeat):
+    # runs inside the child interpreter
+    import warnings
+
+    warnings.filterwarnings("ignore")
+    run = CASES[name][1](dataset_path)
+    setup_rss = peak_rss_mb()
+    walls = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = run()
+        walls.append(time.perf_counter() - start)
+    tracemalloc.start()
+    run()
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "wall_s": min(walls),
+        "first_s": walls[0],  # includes lazy imports and cold caches
+        "items": items,
+        "us_per_item": min(walls) / max(items, 1) * 1e6,
+        "setup_rss_mb": setup_rss,
+        "peak_rss_mb": peak_rss_mb(),
+        "alloc_peak_mb": alloc_peak / 2**20,
+    }
+
+
+def measure(name, scale, data_dir, repeat):
+    if name.startswith("cold_start:"):
+        import bench_startup
+
+        result = bench_startup.measure(os.path.join(ROOT, "web_app.py"), name.split(":", 1)[1])
+        wall = result["first_paint_s"]
+        return {"wall_s": wall, "first_s": wall, "items": 1, "us_per_item": wall * 1e6,
+                "peak_rss_mb": result["peak_rss_mb"], "alloc_peak_mb": None}
+    dataset_path = synthetic_dataset(scale, data_dir) if scale != 1 else DATASET_PATH
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-case", name,
+                             "--dataset", dataset_path, "--repeat", str(repeat)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(result, base, tolerance, memory_tolerance):
+    """Ratios against the baseline and the metrics that exceed their tolerance."""
+    limits = {"wall_s": tolerance, "peak_rss_mb": memory_tolerance, "alloc_peak_mb": memory_tolerance}
+    ratios, regressions = {}, []
+    for metric, limit in limits.items():
+        if result.get(metric) is None or not (base or {}).get(metric):
+            continue
+        ratios[metric] = result[metric] / base[metric]
+        if ratios[metric] > 1 + limit:
+            regressions.append(metric)
+    return ratios, regressions
+
+
+def _fmt(value, width, decimals):
+    return f"{value:>{width}.{decimals}f}" if value is not None else "-".rjust(width)
+
+
+def main(argv=None):
+    all_cases = list(CASES) + [f"cold_start:{page}" for page in COLD_START_PAGES]
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", nargs="+", default=all_cases, choices=all_cases, metavar="CASE")
+    parser.add_argument("--scales", nargs="+", type=int, default=DEFAULT_SCALES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="where synthetic datasets are cached")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed wall-time slowdown")
+    parser.add_argument("--memory-tolerance", type=float, default=0.15,
+                        help="allowed growth of peak RSS and tracemalloc peak")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 on any regression")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    parser.add_argument("--dataset", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, args.dataset, args.repeat)))
+        return 0
+
+    machine = {"python": platform.python_version(), "platform": platform.platform(),
+               "cpus": os.cpu_count(), "pandas": pd.__version__, "numpy": np.__version__}
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        baseline = stored["results"]
+        if stored["machine"] != machine:
+            print(f"note: baseline was recorded on {stored['machine']}; timings may not be comparable")
+
+    results, failed = {}, []
+    print(f"{'case':<34} {'scale':>5} {'wall s':>9} {'us/item':>10} {'RSS MB':>8} {'alloc MB':>9}  vs baseline")
+    for name in args.cases:
+        scaled = not name.startswith("cold_start:") and CASES[name][0]
+        for scale in (args.scales if scaled else [1]):
+            key = f"{name}@{scale}x"
+            result = results[key] = measure(name, scale, args.data_dir, args.repeat)
+            ratios, regressions = compare(result, baseline.get(key), args.tolerance, args.memory_tolerance)
+            failed += [f"{key} {metric}" for metric in regressions]
+            versus = " ".join(f"{METRIC_LABELS[metric]} x{ratio:.2f}{'!' if metric in regressions else ''}"
+                              for metric, ratio in ratios.items()) or "no baseline"
+            print(f"{name:<34} {scale:>5} {result['wall_s']:>9.4f} {result['us_per_item']:>10.1f} "
+                  f"{_fmt(result['peak_rss_mb'], 8, 0)} {_fmt(result['alloc_peak_mb'], 9, 1)}  {versus}",
+                  flush=True)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": machine,
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        # merge, so a partial run only replaces the cases it measured
+        report["results"] = {**baseline, **results}
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline written to {args.baseline}")
+    if failed:
+        print("regressions: " + ", ".join(failed))
+        return 1 if args.check else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from artifacts import BASE_DIR, PICKLE_DIR, artifact_paths, file_signature
+
+# pandas, scikit-learn and plotly are imported inside the loaders below so a
+# session only pays for them on the page that needs them.
+
+DATASET_PATH = os.path.join(BASE_DIR, "dataset.csv")
+SEVERITY_PATH = os.path.join(BASE_DIR, "Symptom-severity.csv")
+
+# Entries are keyed on the source files' signature, so a replaced file
+# becomes a new entry and the stale one is evicted once the cache is full.
+MAX_MODEL_ENTRIES = 2
+MAX_DATA_ENTRIES = 4
+DATASET_PREVIEW_ROWS = 10
+
+_warmup_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-warmup")
+_warmup_lock = threading.Lock()
+_warmups = {}  # pickle_dir -> (signature, Future[Predictor])
+
+
+def _build_predictor(pickle_dir):
+    import instrumentation
+    from artifacts import load_artifacts
+    from inference import Predictor
+
+    # encoder lookup tables are compiled once per loaded bundle; the memo
+    # capacity comes from $HEALTH_HUNCH_MEMO_CAPACITY
+    predictor = Predictor(load_artifacts(pickle_dir))
+    instrumentation.register_stats("probability_memo", predictor.memo.stats)
+    return predictor
+
+
+def _warmup(pickle_dir, signature):
+    with _warmup_lock:
+        current = _warmups.get(pickle_dir)
+        stale = (current is None or current[0] != signature
+                 or (current[1].done() and current[1].exception() is not None))
+        if stale:
+            current = (signature, _warmup_executor.submit(_build_predictor, pickle_dir))
+            _warmups[pickle_dir] = current
+        return current[1]
+
+
+@st.cache_resource(max_entries=MAX_MODEL_ENTRIES, show_spinner="Loading model ...")
+def _cached_predictor(pickle_dir, signature):
+    return _warmup(pickle_dir, signature).result()
+
+
+@st.cache_data(max_entries=MAX_DATA_ENTRIES, show_spinner=False)
+def _cached_datasets(signature):
+    import pandas as pd
+
+    # only a preview of dataset.csv is shown, so don't load the whole file
+    return pd.read_csv(DATASET_PATH, nrows=DATASET_PREVIEW_ROWS), pd.read_csv(SEVERITY_PATH)
+
+
+@st.cache_data(max_entries=MAX_DATA_ENTRIES, show_spinner="Building charts ...")
+def _cached_figures(signature):
+    from analytics import load_cube
+    from visualization import visualize_cube
+
+    # the cube on disk is extended with appended rows instead of rebuilt
+    return visualize_cube(load_cube(DATASET_PATH, SEVERITY_PATH))
+
+
+@st.cache_data(max_entries=MAX_DATA_ENTRIES, show_spinner=False)
+def _cached_payload_sizes(signature):
+    from visualization import payload_sizes
+
+    return payload_sizes(_cached_figures(signature))
+
+
+@st.cache_resource(max_entries=1, show_spinner="Building search index ...")
+def _cached_search_index(curated):
+    from search_index import SearchIndex
+
+    return SearchIndex(DATASET_PATH, SEVERITY_PATH, curated)
+
+
+def _data_signature():
+    return file_signature(DATASET_PATH, SEVERITY_PATH)
+
+
+def warm_model_bundle(pickle_dir=PICKLE_DIR):
+    # starts loading the model on a background thread and returns at once
+    return _warmup(pickle_dir, file_signature(*artifact_paths(pickle_dir)))
+
+
+def load_predictor(pickle_dir=PICKLE_DIR):
+    # shared by every session in the process; reloaded when a pickle changes
+    return _cached_predictor(pickle_dir, file_signature(*artifact_paths(pickle_dir)))
+
+
+def load_model_bundle(pickle_dir=PICKLE_DIR):
+    return load_predictor(pickle_dir).bundle
+
+
+def load_datasets():
+    return _cached_datasets(_data_signature())
+
+
+def load_figures():
+    return _cached_figures(_data_signature())
+
+
+def load_figure_payload_sizes():
+    return _cached_payload_sizes(_data_signature())
+
+
+def load_search_index(curated=()):
+    # one index for the whole process; refresh() folds in rows appended to
+    # dataset.csv and rebuilds after any other change to the CSVs
+    index = _cached_search_index(tuple(curated))
+    index.refresh()
+    return index
+
+
+def clear_caches():
+    with _warmup_lock:
+        _warmups.clear()
+    _cached_predictor.clear()
+    _cached_datasets.clear()
+    _cached_figures.clear()
+    _cached_payload_sizes.clear()
+    _cached_search_index.clear()
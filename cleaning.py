@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+
+# Misspelled symptom names that appear in dataset.csv but not in
+# Symptom-severity.csv. They are weighted 0 like empty cells.
+MISSPELLED_SYMPTOMS = ['dischromic _patches',
+                       'spotting_ urination',
+                       'foul_smell_of urine']
+
+
+def build_weight_table(df1):
+    # symptom -> weight lookup, first occurrence wins (same as the old loop)
+    table = df1.drop_duplicates(subset='Symptom', keep='first')
+    weights = pd.Series(table['weight'].values, index=table['Symptom'].str.strip())
+    weights = weights[~weights.index.duplicated(keep='first')]
+
+    misspelled = pd.Series(0, index=MISSPELLED_SYMPTOMS)
+    weights = pd.concat([weights, misspelled[~misspelled.index.isin(weights.index)]])
+
+    if weights.max() <= np.iinfo(np.int8).max and weights.min() >= np.iinfo(np.int8).min:
+        return weights.astype(np.int8)
+    return weights.astype(np.int32)
+
+
+def encode_symptoms(values, weights):
+    # Factorize the raw cells once so strip/lookup only run over the
+    # distinct strings, then gather the weights back by integer code.
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object).ravel())
+    unique_weights = (pd.Series(uniques, dtype=object).str.strip()
+                      .map(weights).fillna(0).to_numpy(dtype=weights.dtype))
+    # code -1 (empty cell) picks the trailing 0
+    unique_weights = np.append(unique_weights, np.zeros(1, dtype=weights.dtype))
+    return unique_weights[codes].reshape(np.shape(values))
+
+
+def encode_categorical(column, weights):
+    # categorical column: only its categories need stripping and lookup
+    category_weights = (pd.Series(column.cat.categories, dtype=object).str.strip()
+                        .map(weights).fillna(0).to_numpy(dtype=weights.dtype))
+    category_weights = np.append(category_weights, np.zeros(1, dtype=weights.dtype))
+    return category_weights[column.cat.codes.to_numpy()]
+
+
+def apply_weights(df, weights):
+    # clean_data with a prebuilt weight table, for callers cleaning many chunks
+    symptom_cols = [c for c in df.columns if c != 'Disease']
+    if all(isinstance(df[c].dtype, pd.CategoricalDtype) for c in symptom_cols):
+        encoded = {c: encode_categorical(df[c], weights) for c in symptom_cols}
+        df_cleaned = pd.DataFrame(encoded, index=df.index)
+    else:
+        encoded = encode_symptoms(df[symptom_cols].to_numpy(dtype=object), weights)
+        df_cleaned = pd.DataFrame(encoded, columns=symptom_cols, index=df.index)
+    if 'Disease' in df.columns:
+        df_cleaned.insert(0, 'Disease', df['Disease'].astype(object).str.strip())
+    # keep the original column order
+    return df_cleaned[list(df.columns)]
+
+
+@timed("clean_data")
+def clean_data(df, df1):
+    return apply_weights(df, build_weight_table(df1))
@@ -0,0 +1,183 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+
+DEFAULT_MEMO_CAPACITY = 4096
+MEMO_CAPACITY_ENV = "HEALTH_HUNCH_MEMO_CAPACITY"  # 0 turns the memo off
+DEFAULT_TOP_K = 5
+MISSING_LABEL = "nan"  # how the encoders store an empty cell (astype(str) in the notebook)
+
+
+class SymptomEncoderTable:
+    """Per-column LabelEncoders compiled into one dense lookup table.
+
+    Row ``i`` of ``table`` holds the code of vocabulary string ``i`` in every
+    column (-1 where that column's encoder never saw it); the extra last row
+    is all -1 for values no encoder knows. Encoding a symptom vector is then
+    a vocabulary lookup plus a single fancy-index gather.
+    """
+
+    def __init__(self, columns, vocabulary, table, encoded):
+        self.columns = list(columns)
+        self.encoded = np.asarray(encoded, dtype=bool)
+        vocabulary = list(vocabulary)
+        self.vocabulary = {cls: i for i, cls in enumerate(vocabulary)}
+        self.vocabulary_index = pd.Index(vocabulary, dtype=object)
+        self.unknown = len(vocabulary)
+        self.table = table
+        self._column_index = np.arange(len(self.columns))
+
+    @classmethod
+    def from_encoders(cls, symptom_encoders, X_columns):
+        columns = list(X_columns)
+        vocabulary = sorted({label for c in columns if c in symptom_encoders
+                             for label in symptom_encoders[c].classes_})
+        rows_by_label = {label: i for i, label in enumerate(vocabulary)}
+
+        table = np.full((len(vocabulary) + 1, len(columns)), -1, dtype=np.int64)
+        for j, column in enumerate(columns):
+            if column in symptom_encoders:
+                rows = [rows_by_label[label] for label in symptom_encoders[column].classes_]
+                table[rows, j] = np.arange(len(rows))
+        encoded = [c in symptom_encoders for c in columns]
+        return cls(columns, vocabulary, table, encoded)
+
+    def _lookup(self, value):
+        try:
+            return self.vocabulary.get(value, self.unknown)
+        except TypeError:  # unhashable
+            return self.unknown
+
+    def encode(self, symptoms):
+        rows = [self._lookup(value) for value in symptoms]
+        codes = self.table[rows, self._column_index]
+        if not self.encoded.all():
+            # columns without an encoder pass through unchanged
+            raw = np.asarray(symptoms, dtype=object)
+            codes = np.where(self.encoded, codes, raw)
+        return codes
+
+    def encode_many(self, values):
+        # values: 2-D array-like of raw symptom cells, one row per record
+        values = np.asarray(values, dtype=object)
+        rows = self.vocabulary_index.get_indexer(values.ravel()).reshape(values.shape)
+        rows[rows < 0] = self.unknown
+        codes = self.table[rows, self._column_index]
+        if not self.encoded.all():
+            codes = np.where(self.encoded, codes, values)
+        return codes
+
+
+def configured_memo_capacity():
+    value = os.environ.get(MEMO_CAPACITY_ENV, "")
+    try:
+        return max(int(value), 0) if value else DEFAULT_MEMO_CAPACITY
+    except ValueError:
+        raise ValueError(f"{MEMO_CAPACITY_ENV} must be an integer, got {value!r}") from None
+
+
+class ProbabilityMemo:
+    """Thread-safe LRU of class-probability rows keyed on encoded symptom vectors.
+
+    ``capacity`` defaults to $HEALTH_HUNCH_MEMO_CAPACITY, else 4096 entries.
+    """
+
+    def __init__(self, capacity=None):
+        self.capacity = configured_memo_capacity() if capacity is None else capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            proba = self._entries.get(key)
+            if proba is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return proba
+
+    def put(self, key, proba):
+        if self.capacity <= 0:
+            return
+        proba.setflags(write=False)
+        with self._lock:
+            self._entries[key] = proba
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries),
+                    "capacity": self.capacity,
+                    "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+class Predictor:
+    def __init__(self, bundle, memo_capacity=None):
+        self.bundle = bundle
+        self.model = bundle.model
+        self.disease_encoder = bundle.disease_encoder
+        self.encoder_table = SymptomEncoderTable.from_encoders(bundle.symptom_encoders, bundle.X_columns)
+        self.columns = self.encoder_table.columns
+        self.disease_classes = np.asarray(bundle.disease_encoder.classes_)
+        self.memo = ProbabilityMemo(memo_capacity)
+
+    def _frame(self, codes):
+        # the model was fitted on a DataFrame, so keep the feature names
+        return pd.DataFrame(np.atleast_2d(codes), columns=self.columns)
+
+    @timed("predict")
+    def predict(self, symptoms):
+        predicted_label = self.model.predict(self._frame(self.encoder_table.encode(symptoms)))
+        return self.disease_classes[predicted_label[0]]
+
+    @timed("predict_many")
+    def predict_many(self, values):
+        predicted_labels = self.model.predict(self._frame(self.encoder_table.encode_many(values)))
+        return self.disease_classes[predicted_labels]
+
+    def _proba_diseases(self):
+        # disease names in the column order of predict_proba
+        return self.disease_classes[np.asarray(self.model.classes_)]
+
+    def predict_proba(self, symptoms):
+        """Class probabilities for one symptom vector, memoized.
+
+        The memo key is the encoded vector, so inputs that encode the same
+        (e.g. different unknown strings, "" vs 0) share an entry. It is not
+        order-insensitive: each Symptom_N column has its own encoder and the
+        model scores positions differently.
+        """
+        codes = self.encoder_table.encode(symptoms)
+        key = np.asarray(codes, dtype=np.int64).tobytes() if self.encoder_table.encoded.all() else None
+        proba = self.memo.get(key) if key is not None else None
+        if proba is None:
+            proba = np.asarray(self.model.predict_proba(self._frame(codes))[0], dtype=np.float64)
+            if key is not None:
+                self.memo.put(key, proba)
+        return proba
+
+    @timed("top_k")
+    def top_k(self, symptoms, k=DEFAULT_TOP_K):
+        """The ``k`` most likely diseases as ``[(disease, probability), ...]``."""
+        proba = self.predict_proba(symptoms)
+        k = min(k, len(proba))
+        best = np.argpartition(-proba, k - 1)[:k]
+        best = best[np.argsort(-proba[best], kind='stable')]
+        diseases = self._proba_diseases()
+        return [(str(diseases[i]), float(proba[i])) for i in best]
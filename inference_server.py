@@ -0,0 +1,298 @@
+"""Standalone HTTP inference service for the Self-Diagnosis model.
+
+Loads the pickles (or a --bundle from model_bundle.py) once and collects
+concurrent requests into micro-batches, so each batch costs a single
+``model.predict`` call. Standard library only (asyncio), no web framework::
+
+    python inference_server.py --port 8502 --max-batch-size 64 --max-wait-ms 5
+
+Endpoints:
+
+* ``POST /predict`` with ``{"symptoms": [...]}`` (one value per X column, in
+  order) or ``{"symptoms": {"Symptom_1": ..., ...}}``; returns
+  ``{"disease": ...}``.
+* ``GET /health`` returns the service status.
+* ``GET /metrics`` returns request, batch and latency counters, plus the
+  probability memo's stats (sized by ``HEALTH_HUNCH_MEMO_CAPACITY``).
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from artifacts import PICKLE_DIR
+from model_bundle import open_predictor
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+LATENCY_WINDOW = 10_000
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class ServerMetrics:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_items = 0
+        self.max_batch = 0
+        self.latencies_ms = deque(maxlen=LATENCY_WINDOW)
+
+    def record_batch(self, size):
+        self.batches += 1
+        self.batched_items += size
+        self.max_batch = max(self.max_batch, size)
+
+    def record_request(self, latency_ms, ok=True):
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+        self.latencies_ms.append(latency_ms)
+
+    def snapshot(self):
+        uptime = time.monotonic() - self.started
+        latencies = np.fromiter(self.latencies_ms, dtype=float)
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (0.0, 0.0)
+        return {
+            "uptime_s": round(uptime, 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "throughput_rps": round(self.requests / uptime, 2) if uptime else 0.0,
+            "batches": self.batches,
+            "mean_batch_size": round(self.batched_items / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch,
+            "latency_p50_ms": round(float(p50), 3),
+            "latency_p99_ms": round(float(p99), 3),
+        }
+
+
+class MicroBatcher:
+    """Queues single predictions and flushes them as one ``predict_many``.
+
+    A batch is flushed once it holds ``max_batch_size`` items or
+    ``max_wait_ms`` has passed since its first item arrived. The model runs
+    on a single worker thread so the event loop keeps accepting requests.
+    """
+
+    def __init__(self, predictor, metrics, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.predictor = predictor
+        self.metrics = metrics
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="predict")
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    async def predict(self, symptoms):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((symptoms, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            rows = [symptoms for symptoms, _ in batch]
+            try:
+                diseases = await loop.run_in_executor(self._executor, self.predictor.predict_many, rows)
+            except Exception:
+                # score the rows one by one so a bad row only fails its own request
+                await self._run_singly(batch)
+                continue
+            self.metrics.record_batch(len(batch))
+            for (_, future), disease in zip(batch, diseases):
+                if not future.done():
+                    future.set_result(str(disease))
+
+    async def _run_singly(self, batch):
+        loop = asyncio.get_running_loop()
+        for symptoms, future in batch:
+            try:
+                disease = await loop.run_in_executor(self._executor, self.predictor.predict, symptoms)
+            except Exception as exc:
+                if not future.done():
+                    future.set_exception(exc)
+                continue
+            self.metrics.record_batch(1)
+            if not future.done():
+                future.set_result(str(disease))
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class InferenceServer:
+    def __init__(self, predictor, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.predictor = predictor
+        self.metrics = ServerMetrics()
+        self.batcher = MicroBatcher(predictor, self.metrics, max_batch_size, max_wait_ms)
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=8502):
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+
+    def _parse_symptoms(self, body):
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            raise HTTPError(400, "body is not valid JSON")
+        symptoms = payload.get("symptoms") if isinstance(payload, dict) else None
+        columns = self.predictor.columns
+        if isinstance(symptoms, dict):
+            symptoms = [symptoms.get(column, 0) for column in columns]
+        if not isinstance(symptoms, list) or len(symptoms) != len(columns):
+            raise HTTPError(400, f"'symptoms' must be a list of {len(columns)} values "
+                                 f"or an object keyed by {columns[0]}..{columns[-1]}")
+        bad = [value for value in symptoms if value is not None and not isinstance(value, (str, int, float))]
+        if bad:
+            raise HTTPError(400, f"symptom values must be strings, numbers or null, got {bad[0]!r}")
+        # empty selections mean "no symptom", as on the Self-Diagnosis page
+        return [value if value not in (None, "") else 0 for value in symptoms]
+
+    async def _route(self, method, path, body):
+        if path == "/predict":
+            if method != "POST":
+                raise HTTPError(405, "use POST")
+            disease = await self.batcher.predict(self._parse_symptoms(body))
+            return {"disease": disease}
+        if path == "/health":
+            return {"status": "ok", "queued": self.batcher._queue.qsize()}
+        if path == "/metrics":
+            return {**self.metrics.snapshot(), "probability_memo": self.predictor.memo.stats()}
+        raise HTTPError(404, f"no route for {path}")
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                start = time.perf_counter()
+                try:
+                    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "malformed request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length") or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "invalid Content-Length"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                path = target.split("?", 1)[0]
+                try:
+                    status, payload = 200, await self._route(method.upper(), path, body)
+                except HTTPError as exc:
+                    status, payload = exc.status, {"error": str(exc)}
+                except Exception as exc:
+                    status, payload = 500, {"error": repr(exc)}
+                if path == "/predict":
+                    self.metrics.record_request((time.perf_counter() - start) * 1000, status == 200)
+
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(host, port, max_batch_size, max_wait_ms, pickle_dir=PICKLE_DIR, bundle_dir=None):
+    server = InferenceServer(open_predictor(bundle_dir, pickle_dir), max_batch_size, max_wait_ms)
+    bound_host, bound_port = await server.start(host, port)
+    print(f"serving on http://{bound_host}:{bound_port}", flush=True)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS)
+    parser.add_argument("--pickle-dir", default=PICKLE_DIR)
+    parser.add_argument("--bundle", help="memory-mapped model bundle directory (see model_bundle.py)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_batch_size, args.max_wait_ms,
+                          args.pickle_dir, args.bundle))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Streaming ingestion of symptom logs laid out like dataset.csv.
+
+Reads the CSV in chunks with every column typed as ``category`` so each
+chunk only strips and weight-maps its distinct strings, then either writes
+the cleaned int8 chunks to a Parquet cache or folds them into an
+``AnalyticsCube``. Peak memory follows ``--chunksize``, not the file size::
+
+    python ingest.py dataset.csv --parquet .cache/dataset_cleaned.parquet
+    python ingest.py big_log.csv --cube .cache/analytics_cube.npz --chunksize 200000
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from cleaning import apply_weights, build_weight_table
+from instrumentation import timed
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+class _BoundedReader:
+    """File wrapper that stops after ``limit`` bytes (used to skip a partial last row)."""
+
+    def __init__(self, f, limit):
+        self._f = f
+        self._remaining = limit
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._f.read(size)
+        self._remaining -= len(data)
+        return data
+
+
+def file_digest(path, end=None):
+    # sha1 of the first ``end`` bytes (the whole file by default); hashing
+    # is far cheaper than parsing the same bytes as CSV
+    digest = hashlib.sha1()
+    remaining = os.path.getsize(path) if end is None else end
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            block = f.read(min(remaining, 1 << 20))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def complete_lines_end(path, offset=0):
+    # byte offset just past the last newline at or after ``offset``
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        block = 1 << 16
+        while end > offset:
+            start = max(end - block, offset)
+            f.seek(start)
+            data = f.read(end - start)
+            newline = data.rfind(b'\n')
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return offset
+
+
+def read_chunks(path, chunksize=DEFAULT_CHUNKSIZE, offset=0, end=None, names=None):
+    """Yield raw categorical chunks of ``path`` between byte ``offset`` and ``end``.
+
+    Without ``names`` the first line is the header. ``end`` defaults to the
+    last complete line, so a row that is still being appended is skipped.
+    """
+    if end is None:
+        end = complete_lines_end(path, offset)
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        if end <= offset:
+            return
+        options = dict(header=0) if names is None else dict(header=None, names=names)
+        yield from pd.read_csv(_BoundedReader(f, end - offset), chunksize=chunksize,
+                               dtype='category', **options)
+
+
+def iter_cleaned_chunks(path, df_weights, chunksize=DEFAULT_CHUNKSIZE, **read_options):
+    weights = build_weight_table(df_weights)
+    for chunk in read_chunks(path, chunksize, **read_options):
+        yield apply_weights(chunk, weights)
+
+
+@timed("read_cleaned")
+def read_cleaned(path, df_weights, chunksize=DEFAULT_CHUNKSIZE):
+    # whole cleaned frame, assembled from compact int8 chunks
+    chunks = list(iter_cleaned_chunks(path, df_weights, chunksize))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+
+def ingest_to_cube(path, df_weights, chunksize=DEFAULT_CHUNKSIZE, cube=None, **read_options):
+    from analytics import AnalyticsCube
+
+    for cleaned in iter_cleaned_chunks(path, df_weights, chunksize, **read_options):
+        if cube is None:
+            cube = AnalyticsCube([c for c in cleaned.columns if c != 'Disease'])
+        cube.update(cleaned)
+    return cube
+
+
+def ingest_to_parquet(path, df_weights, out_path, chunksize=DEFAULT_CHUNKSIZE):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = 0
+    out_dir = os.path.dirname(os.path.abspath(out_path))
+    os.makedirs(out_dir, exist_ok=True)
+    # a private temp file per writer, moved into place once complete
+    fd, tmp_path = tempfile.mkstemp(prefix=".cleaned.", suffix=".parquet", dir=out_dir)
+    os.close(fd)
+    writer = None
+    try:
+        try:
+            for cleaned in iter_cleaned_chunks(path, df_weights, chunksize):
+                table = pa.Table.from_pandas(cleaned, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table)
+                rows += len(cleaned)
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is not None:
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return rows
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return float('nan')
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("dataset", help="CSV laid out like dataset.csv")
+    parser.add_argument("--severity", default="Symptom-severity.csv")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--parquet", help="write the cleaned rows to this Parquet file")
+    target.add_argument("--cube", help="build an analytics cube and save it to this .npz")
+    args = parser.parse_args(argv)
+
+    df_weights = pd.read_csv(args.severity)
+    start = time.perf_counter()
+    if args.parquet:
+        rows = ingest_to_parquet(args.dataset, df_weights, args.parquet, args.chunksize)
+    else:
+        from analytics import load_cube
+
+        rows = load_cube(args.dataset, args.severity, args.cube, args.chunksize).n_rows
+    elapsed = time.perf_counter() - start
+    print(f"ingested {rows} rows in {elapsed:.2f}s, peak RSS {peak_rss_mb():.0f} MB",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
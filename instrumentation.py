@@ -0,0 +1,179 @@
+"""Opt-in timing spans around the app's hot paths.
+
+Off by default; a disabled span costs one flag check. Turn it on with
+``HEALTH_HUNCH_PROFILE=1``; the app then shows a "Debug: timings" panel
+in the sidebar. ``HEALTH_HUNCH_PROFILE_DUMP=metrics.json`` also writes the
+collected spans, and the counters registered with ``register_stats`` (such
+as the probability memo's hit rate), to that file when the process exits::
+
+    HEALTH_HUNCH_PROFILE=1 HEALTH_HUNCH_PROFILE_DUMP=metrics.json streamlit run web_app.py
+
+Kept free of numpy/pandas so importing it does not slow the first page.
+"""
+import atexit
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+PROFILE_ENV = "HEALTH_HUNCH_PROFILE"
+DUMP_ENV = "HEALTH_HUNCH_PROFILE_DUMP"
+SPAN_WINDOW = 2048  # recent durations kept per span for the percentiles
+
+
+class SpanStats:
+    __slots__ = ("calls", "errors", "total", "max", "recent")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=SPAN_WINDOW)
+
+    def add(self, seconds, ok=True):
+        self.calls += 1
+        if not ok:
+            self.errors += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def summary(self):
+        recent = sorted(self.recent)
+
+        def percentile(q):
+            return recent[min(int(q * len(recent)), len(recent) - 1)] * 1000 if recent else 0.0
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total * 1000 / self.calls, 3) if self.calls else 0.0,
+            "p50_ms": round(percentile(0.5), 3),
+            "p99_ms": round(percentile(0.99), 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class SpanRecorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans = {}
+        self._stats = {}  # name -> callable returning a dict of counters
+        self.started = time.time()
+
+    def record(self, name, seconds, ok=True):
+        with self._lock:
+            stats = self._spans.get(name)
+            if stats is None:
+                stats = self._spans[name] = SpanStats()
+            stats.add(seconds, ok)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: stats.summary() for name, stats in sorted(self._spans.items())}
+
+    def register_stats(self, name, provider):
+        with self._lock:
+            self._stats[name] = provider
+
+    def stats(self):
+        with self._lock:
+            providers = dict(self._stats)
+        return {name: provider() for name, provider in sorted(providers.items())}
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self.started = time.time()
+
+    def payload(self):
+        # what the metrics dump contains
+        return {"started": self.started, "dumped": time.time(), "pid": os.getpid(),
+                "spans": self.snapshot(), "stats": self.stats()}
+
+    def dump(self, path):
+        payload = self.payload()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f, indent=2)
+        os.replace(tmp_path, path)
+        return payload
+
+
+recorder = SpanRecorder()
+_enabled = os.environ.get(PROFILE_ENV, "").lower() not in ("", "0", "false", "no")
+
+
+def enabled():
+    return _enabled
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = bool(flag)
+
+
+def record(name, seconds, ok=True):
+    if _enabled:
+        recorder.record(name, seconds, ok)
+
+
+def snapshot():
+    return recorder.snapshot()
+
+
+def register_stats(name, provider):
+    # counters owned by other objects (e.g. a cache's hit/miss stats), shown
+    # in the debug panel and the metrics dump next to the spans
+    recorder.register_stats(name, provider)
+
+
+def stats():
+    return recorder.stats()
+
+
+@contextlib.contextmanager
+def span(name):
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        recorder.record(name, time.perf_counter() - start, ok)
+
+
+def timed(name):
+    """Decorator form of ``span``."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            ok = False
+            try:
+                result = func(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                recorder.record(name, time.perf_counter() - start, ok)
+        return wrapper
+    return decorate
+
+
+def _dump_at_exit():
+    if _enabled:
+        recorder.dump(os.environ[DUMP_ENV])
+
+
+if os.environ.get(DUMP_ENV):
+    atexit.register(_dump_at_exit)
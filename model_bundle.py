@@ -0,0 +1,285 @@
+"""Versioned, memory-mappable model bundle.
+
+Converts the four pickles in "pickle files/" into one directory of raw
+NumPy arrays plus a ``manifest.json``. Every array is opened with
+``np.load(mmap_mode="r")``, so several worker processes on a host share the
+model pages through the OS page cache instead of each unpickling a copy::
+
+    python model_bundle.py convert            # pickles -> model_bundle/, then verify
+    python model_bundle.py verify             # re-check an existing bundle
+
+Supported models: linear classifiers (``coef_``/``intercept_``, e.g. the
+current LogisticRegression) and decision-tree / random-forest classifiers,
+whose trees are stored back to back in flat node arrays.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from artifacts import BASE_DIR, PICKLE_DIR, load_artifacts
+from inference import Predictor, ProbabilityMemo, SymptomEncoderTable
+
+BUNDLE_FORMAT = "health-hunch-model-bundle"
+BUNDLE_VERSION = 1
+DEFAULT_BUNDLE_DIR = os.path.join(BASE_DIR, "model_bundle")
+MANIFEST = "manifest.json"
+
+
+class LinearModelArrays:
+    """``proba`` is "softmax" (multinomial) or "ovr" (normalized sigmoids), as in LogisticRegression."""
+
+    def __init__(self, coef, intercept, classes, proba="softmax"):
+        self.coef = coef
+        self.intercept = intercept
+        self.classes_ = classes
+        self.proba = proba
+
+    def decision_function(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef.T + self.intercept
+
+    def predict(self, X):
+        scores = self.decision_function(X)
+        if scores.shape[1] == 1:
+            return self.classes_[(scores[:, 0] > 0).astype(np.intp)]
+        return self.classes_[scores.argmax(axis=1)]
+
+    def predict_proba(self, X):
+        scores = self.decision_function(X)
+        if self.proba == "softmax" and scores.shape[1] > 1:
+            scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+            return scores / scores.sum(axis=1, keepdims=True)
+        proba = 1 / (1 + np.exp(-scores))
+        if proba.shape[1] == 1:
+            return np.hstack([1 - proba, proba])
+        return proba / proba.sum(axis=1, keepdims=True)
+
+
+class ForestArrays:
+    """Tree ensemble stored as flat node arrays; ``roots[t]`` is tree t's root.
+
+    Child indices are global (already offset), leaves have ``left == -1`` and
+    ``value`` holds per-node class fractions, so prediction is the argmax
+    of the mean leaf value, as in RandomForestClassifier.
+    """
+
+    def __init__(self, roots, left, right, feature, threshold, value, classes):
+        self.roots = roots
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.classes_ = classes
+
+    def predict_proba(self, X):
+        # sklearn trees compare float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))
+        proba = np.zeros((len(X), self.value.shape[1]))
+        for root in self.roots:
+            node = np.full(len(X), root, dtype=np.intp)
+            active = self.left[node] != -1
+            while active.any():
+                current = node[active]
+                go_left = X[rows[active], self.feature[current]] <= self.threshold[current]
+                node[active] = np.where(go_left, self.left[current], self.right[current])
+                active = self.left[node] != -1
+            proba += self.value[node]
+        return proba / len(self.roots)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+class BundlePredictor(Predictor):
+    """Predictor backed by a memory-mapped bundle instead of sklearn objects."""
+
+    def __init__(self, model, encoder_table, disease_classes, manifest, memo_capacity=None):
+        self.bundle = None
+        self.model = model
+        self.encoder_table = encoder_table
+        self.columns = encoder_table.columns
+        self.disease_classes = disease_classes
+        self.manifest = manifest
+        self.memo = ProbabilityMemo(memo_capacity)
+
+    def _frame(self, codes):
+        return np.atleast_2d(codes)
+
+
+def _linear_proba(model):
+    # mirrors LogisticRegression.predict_proba's choice between OvR and multinomial
+    multi_class = getattr(model, "multi_class", "auto")
+    if multi_class in ("ovr", "warn") or (multi_class in ("auto", "deprecated") and (
+            len(model.classes_) <= 2 or getattr(model, "solver", None) == "liblinear")):
+        return "ovr"
+    return "softmax"
+
+
+def _model_arrays(model):
+    if hasattr(model, "coef_") and hasattr(model, "intercept_"):
+        return "linear", {"coef": model.coef_, "intercept": model.intercept_,
+                          "classes": model.classes_}
+
+    estimators = getattr(model, "estimators_", None)
+    if estimators is None and hasattr(model, "tree_"):
+        estimators = [model]
+    if estimators is None or not all(hasattr(tree, "tree_") for tree in estimators):
+        raise ValueError(f"unsupported model type for bundling: {type(model).__name__}")
+
+    roots, left, right, feature, threshold, value = [], [], [], [], [], []
+    offset = 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        leaf = tree.children_left == -1
+        roots.append(offset)
+        left.append(np.where(leaf, -1, tree.children_left + offset))
+        right.append(np.where(leaf, -1, tree.children_right + offset))
+        feature.append(np.where(leaf, 0, tree.feature))
+        threshold.append(tree.threshold)
+        node_value = tree.value[:, 0, :]
+        value.append(node_value / node_value.sum(axis=1, keepdims=True))
+        offset += tree.node_count
+    return "forest", {"roots": np.array(roots, dtype=np.intp),
+                      "left": np.concatenate(left).astype(np.intp),
+                      "right": np.concatenate(right).astype(np.intp),
+                      "feature": np.concatenate(feature).astype(np.intp),
+                      "threshold": np.concatenate(threshold),
+                      "value": np.concatenate(value),
+                      "classes": model.classes_}
+
+
+def _string_array(values, what):
+    values = list(values)
+    if not all(isinstance(v, str) for v in values):
+        raise ValueError(f"{what} must all be strings to be bundled")
+    return np.array(values, dtype=str)
+
+
+def write_bundle(bundle, out_dir=DEFAULT_BUNDLE_DIR):
+    """Write ``bundle`` (an artifacts.ModelBundle) to ``out_dir`` atomically."""
+    kind, model_arrays = _model_arrays(bundle.model)
+    encoder_table = SymptomEncoderTable.from_encoders(bundle.symptom_encoders, bundle.X_columns)
+
+    arrays = {f"model_{name}": np.ascontiguousarray(array) for name, array in model_arrays.items()}
+    arrays["encoder_vocabulary"] = _string_array(encoder_table.vocabulary, "encoder classes")
+    arrays["encoder_table"] = encoder_table.table.astype(np.int32)
+    arrays["encoder_encoded"] = encoder_table.encoded
+    arrays["disease_classes"] = _string_array(bundle.disease_encoder.classes_, "disease classes")
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "model_kind": kind,
+        "model_type": type(bundle.model).__name__,
+        "linear_proba": _linear_proba(bundle.model) if kind == "linear" else None,
+        "columns": list(encoder_table.columns),
+        "arrays": {name: {"dtype": str(array.dtype), "shape": list(array.shape)}
+                   for name, array in arrays.items()},
+    }
+
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".bundle-", dir=parent)
+    try:
+        os.chmod(staging, 0o755)  # readable by workers running as other users
+        for name, array in arrays.items():
+            np.save(os.path.join(staging, f"{name}.npy"), array, allow_pickle=False)
+        with open(os.path.join(staging, MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        previous = None
+        if os.path.exists(out_dir):
+            previous = tempfile.mkdtemp(prefix=".bundle-old-", dir=parent)
+            os.rmdir(previous)
+            os.replace(out_dir, previous)
+        os.replace(staging, out_dir)
+        if previous is not None:
+            shutil.rmtree(previous, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return manifest
+
+
+def load_bundle(bundle_dir=DEFAULT_BUNDLE_DIR, mmap_mode="r"):
+    with open(os.path.join(bundle_dir, MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BUNDLE_FORMAT or manifest.get("version") != BUNDLE_VERSION:
+        raise ValueError(f"{bundle_dir} is not a version {BUNDLE_VERSION} model bundle")
+
+    arrays = {name: np.load(os.path.join(bundle_dir, f"{name}.npy"), mmap_mode=mmap_mode,
+                            allow_pickle=False)
+              for name in manifest["arrays"]}
+    model_arrays = {name[len("model_"):]: array for name, array in arrays.items()
+                    if name.startswith("model_")}
+    if manifest["model_kind"] == "linear":
+        model = LinearModelArrays(**model_arrays, proba=manifest.get("linear_proba") or "softmax")
+    else:
+        model = ForestArrays(**model_arrays)
+
+    encoder_table = SymptomEncoderTable(manifest["columns"], arrays["encoder_vocabulary"].tolist(),
+                                        arrays["encoder_table"], arrays["encoder_encoded"])
+    return BundlePredictor(model, encoder_table, arrays["disease_classes"], manifest)
+
+
+def open_predictor(bundle_dir=None, pickle_dir=PICKLE_DIR):
+    # the mmap bundle when one is given, otherwise the pickles
+    if bundle_dir:
+        return load_bundle(bundle_dir)
+    return Predictor(load_artifacts(pickle_dir))
+
+
+def verification_inputs(columns, vocabulary, samples=2000, seed=0):
+    import pandas as pd
+
+    rows = pd.read_csv(os.path.join(BASE_DIR, "dataset.csv"), dtype=object)
+    rows = rows.reindex(columns=columns).to_numpy(dtype=object)
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array(sorted(vocabulary) + [v.strip() for v in vocabulary] + [0], dtype=object)
+    random_rows = rng.choice(vocabulary, size=(samples, len(columns)))
+    return np.concatenate([rows, random_rows])
+
+
+def verify_bundle(bundle_dir=DEFAULT_BUNDLE_DIR, pickle_dir=PICKLE_DIR):
+    """Compare the bundle with the pickles; returns ``(mismatches, checked)``.
+
+    ``checked`` counts every comparison: the batch predictions plus the
+    single-row and top-k checks on the first 200 inputs.
+    """
+    reference = Predictor(load_artifacts(pickle_dir))
+    compiled = load_bundle(bundle_dir)
+    values = verification_inputs(reference.columns, list(reference.encoder_table.vocabulary))
+    expected = reference.predict_many(values)
+    actual = compiled.predict_many(values)
+    mismatches = int((np.asarray(expected, dtype=str) != np.asarray(actual, dtype=str)).sum())
+    # single-row and top-k paths as well
+    for row in values[:200]:
+        mismatches += reference.predict(list(row)) != compiled.predict(list(row))
+        mismatches += ([d for d, _ in reference.top_k(list(row))]
+                       != [d for d, _ in compiled.top_k(list(row))])
+    return mismatches, len(values) + 2 * min(len(values), 200)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["convert", "verify"])
+    parser.add_argument("--pickle-dir", default=PICKLE_DIR)
+    parser.add_argument("--out", default=DEFAULT_BUNDLE_DIR, help="bundle directory")
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        manifest = write_bundle(load_artifacts(args.pickle_dir), args.out)
+        print(f"wrote {manifest['model_type']} bundle v{manifest['version']} to {args.out}")
+    mismatches, checked = verify_bundle(args.out, args.pickle_dir)
+    print(f"verified {checked} predictions: {mismatches} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
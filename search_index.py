@@ -0,0 +1,289 @@
+"""Symptom and disease search behind the About page's Symptom Checker.
+
+``SearchIndex`` is built from the data the model was trained on instead of
+a hand-written list:
+
+* symptoms from Symptom-severity.csv and dataset.csv, diseases from
+  dataset.csv, plus optional curated conditions ("Name - description");
+* a prefix trie over every name and every word inside it, for typeahead;
+* a trigram index that shortlists candidates for fuzzy (misspelled) queries;
+* an inverted index symptom -> {disease: rows}, for "which diseases share
+  these symptoms".
+
+``refresh`` re-reads only the rows appended to dataset.csv since the last
+build (same offset + prefix digest check as analytics.load_cube)::
+
+    python search_index.py "stomach pian"
+    python search_index.py --sharing itching skin_rash
+"""
+import argparse
+import difflib
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+from artifacts import BASE_DIR, file_signature
+
+DATASET_PATH = os.path.join(BASE_DIR, "dataset.csv")
+SEVERITY_PATH = os.path.join(BASE_DIR, "Symptom-severity.csv")
+
+DEFAULT_LIMIT = 10
+FUZZY_CANDIDATES = 30
+FUZZY_CUTOFF = 0.7
+
+SYMPTOM, DISEASE, CONDITION = "symptom", "disease", "condition"
+
+
+def normalize(text):
+    # 'dischromic _patches' and 'Dischromic patches' share the key 'dischromic patches'
+    return " ".join(str(text).replace("_", " ").lower().split())
+
+
+def _trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def split_entry(entry):
+    # curated entries look like "Name - description" (sometimes with an en dash)
+    parts = re.split(r"\s+[-–]\s+", entry.strip(), maxsplit=1)
+    return parts[0], parts[1].strip() if len(parts) > 1 else ""
+
+
+class Term:
+    __slots__ = ("id", "key", "label", "kind", "description")
+
+    def __init__(self, term_id, key, label, kind, description=""):
+        self.id = term_id
+        self.key = key
+        self.label = label
+        self.kind = kind
+        self.description = description
+
+
+class _TrieNode:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children = {}
+        self.ids = set()  # every term reachable below this node
+
+
+class SearchIndex:
+    def __init__(self, dataset_path=DATASET_PATH, severity_path=SEVERITY_PATH, curated=()):
+        self.dataset_path = dataset_path
+        self.severity_path = severity_path
+        self.curated = tuple(curated)
+        self._lock = threading.Lock()
+        self._reset()
+        self.refresh()
+
+    def _reset(self):
+        self.terms = []
+        self._by_key = {}
+        self._trie = _TrieNode()
+        self._trigrams = defaultdict(set)
+        self.symptom_diseases = defaultdict(Counter)  # symptom key -> {disease key: rows}
+        self.disease_rows = Counter()
+        self._term_rows = Counter()  # dataset rows mentioning each term, for ranking
+        self._signature = None
+        self._offset = 0
+        self._prefix_digest = None
+        self._severity_digest = None
+        self._header = None
+
+    # -- building ------------------------------------------------------------
+
+    def _add_term(self, label, kind, description=""):
+        key = normalize(label)
+        if not key:
+            return None
+        term = self._by_key.get(key)
+        if term is not None:
+            # a curated condition that is also a dataset disease keeps one entry
+            if description and not term.description:
+                term.description = description
+            return term
+        term = Term(len(self.terms), key, label, kind, description)
+        self.terms.append(term)
+        self._by_key[key] = term
+        words = key.split(" ")
+        for start in range(len(words)):
+            node = self._trie
+            for char in " ".join(words[start:]):
+                node = node.children.setdefault(char, _TrieNode())
+                node.ids.add(term.id)
+        for gram in _trigrams(key):
+            self._trigrams[gram].add(term.id)
+        return term
+
+    def _add_rows(self, chunk):
+        diseases = chunk["Disease"].astype(object).str.strip()
+        for disease, rows in diseases.value_counts().items():
+            self._add_term(disease, DISEASE)
+            self.disease_rows[normalize(disease)] += int(rows)
+            self._term_rows[normalize(disease)] += int(rows)
+
+        pairs = (chunk.astype(object).assign(Disease=diseases)
+                 .melt(id_vars="Disease", value_name="Symptom")
+                 .dropna(subset=["Symptom"]))
+        pairs["Symptom"] = pairs["Symptom"].map(normalize)
+        for (disease, symptom), rows in pairs.groupby(["Disease", "Symptom"]).size().items():
+            self._add_term(symptom.capitalize(), SYMPTOM)
+            self.symptom_diseases[symptom][normalize(disease)] += int(rows)
+            self._term_rows[symptom] += int(rows)
+
+    def _build(self):
+        from ingest import complete_lines_end, file_digest, read_chunks
+
+        self._reset()
+        for symptom in pd.read_csv(self.severity_path)["Symptom"]:
+            self._add_term(normalize(symptom).capitalize(), SYMPTOM)
+        end = complete_lines_end(self.dataset_path)
+        for chunk in read_chunks(self.dataset_path, end=end):
+            self._header = list(chunk.columns)
+            self._add_rows(chunk)
+        for entry in self.curated:
+            name, description = split_entry(entry)
+            self._add_term(name, CONDITION, description)
+        self._offset = end
+        self._prefix_digest = file_digest(self.dataset_path, end)
+        self._severity_digest = file_digest(self.severity_path)
+
+    def refresh(self):
+        """Bring the index up to date with the CSVs; returns True if anything changed.
+
+        Rows appended to dataset.csv are folded in; any other edit (or a new
+        Symptom-severity.csv) rebuilds the index from scratch.
+        """
+        from ingest import complete_lines_end, file_digest, read_chunks
+
+        with self._lock:
+            signature = file_signature(self.dataset_path, self.severity_path)
+            if signature == self._signature:
+                return False
+            appended = (self._header is not None
+                        and file_digest(self.severity_path) == self._severity_digest
+                        and os.path.getsize(self.dataset_path) >= self._offset
+                        and file_digest(self.dataset_path, self._offset) == self._prefix_digest)
+            if appended:
+                end = complete_lines_end(self.dataset_path, self._offset)
+                for chunk in read_chunks(self.dataset_path, offset=self._offset, end=end,
+                                         names=self._header):
+                    self._add_rows(chunk)
+                self._offset = end
+                self._prefix_digest = file_digest(self.dataset_path, end)
+            else:
+                self._build()
+            self._signature = signature
+            return True
+
+    # -- queries -------------------------------------------------------------
+
+    def _rank(self, term):
+        # most common in the dataset first
+        return -self._term_rows[term.key], term.key
+
+    def prefix(self, query, limit=DEFAULT_LIMIT, kinds=None):
+        key = normalize(query)
+        with self._lock:
+            node = self._trie
+            for char in key:
+                node = node.children.get(char)
+                if node is None:
+                    return []
+            matches = [self.terms[i] for i in node.ids]
+        if kinds is not None:
+            matches = [term for term in matches if term.kind in kinds]
+        # names starting with the query before matches on a later word
+        matches.sort(key=lambda term: (not term.key.startswith(key),) + self._rank(term))
+        return matches[:limit] if limit else matches
+
+    def fuzzy(self, query, limit=DEFAULT_LIMIT, cutoff=FUZZY_CUTOFF, kinds=None):
+        key = normalize(query)
+        if not key:
+            return []
+        with self._lock:
+            overlap = Counter()
+            for gram in _trigrams(key):
+                overlap.update(self._trigrams.get(gram, ()))
+            candidates = [self.terms[i] for i, _ in overlap.most_common(FUZZY_CANDIDATES)]
+        scored = []
+        matcher = difflib.SequenceMatcher(b=key, autojunk=False)
+        for term in candidates:
+            if kinds is not None and term.kind not in kinds:
+                continue
+            # compare against the whole name and against its leading words of similar length
+            head = term.key[:len(key) + 2]
+            best = 0.0
+            for text in (term.key, head):
+                matcher.set_seq1(text)
+                if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+                    best = max(best, matcher.ratio())
+            if best >= cutoff:
+                scored.append((-best,) + self._rank(term) + (term,))
+        scored.sort(key=lambda item: item[:-1])
+        return [item[-1] for item in scored[:limit]]
+
+    def typeahead(self, query, limit=DEFAULT_LIMIT, kinds=None):
+        """Prefix matches, or fuzzy matches when the query is misspelled."""
+        return self.prefix(query, limit, kinds) or self.fuzzy(query, limit, kinds=kinds)
+
+    def term(self, name):
+        return self._by_key.get(normalize(name))
+
+    def diseases_sharing(self, symptoms, limit=DEFAULT_LIMIT):
+        """Diseases seen with the given symptoms, best overlap first.
+
+        Returns dicts with the disease, how many of the symptoms it shares
+        and the dataset rows containing those symptoms.
+        """
+        keys = {normalize(symptom) for symptom in symptoms} - {""}
+        matched, rows = Counter(), Counter()
+        with self._lock:
+            for key in keys:
+                for disease, count in self.symptom_diseases.get(key, {}).items():
+                    matched[disease] += 1
+                    rows[disease] += count
+            ranked = sorted(matched, key=lambda d: (-matched[d], -rows[d], d))
+            ranked = ranked[:limit] if limit else ranked
+            return [{"disease": self._by_key[d].label, "shared": matched[d], "of": len(keys),
+                     "rows": rows[d], "disease_rows": self.disease_rows[d]} for d in ranked]
+
+    def symptoms(self):
+        return sorted((t for t in self.terms if t.kind == SYMPTOM), key=lambda t: t.key)
+
+    def stats(self):
+        kinds = Counter(term.kind for term in self.terms)
+        return {"terms": len(self.terms), **kinds, "dataset_rows": sum(self.disease_rows.values())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("query", nargs="*")
+    parser.add_argument("--sharing", action="store_true",
+                        help="treat the arguments as symptoms and list diseases sharing them")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = SearchIndex()
+    print(f"built {index.stats()} in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    if args.sharing:
+        results = index.diseases_sharing(args.query, args.limit)
+        lines = [f"{r['disease']}: {r['shared']}/{r['of']} symptoms, {r['rows']} rows" for r in results]
+    else:
+        lines = [f"{t.label} ({t.kind})" for t in index.typeahead(" ".join(args.query), args.limit)]
+    elapsed = (time.perf_counter() - start) * 1000
+    print("\n".join(lines) or "no matches")
+    print(f"query took {elapsed:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
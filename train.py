@@ -0,0 +1,310 @@
+"""Rebuild the artifacts in "pickle files/" from dataset.csv.
+
+Scripted version of the training in IBM_Project_trial.ipynb: one
+LabelEncoder per symptom column (NaN encoded as the string 'nan'), a
+LabelEncoder for the disease, a 70/30 train/test split and a classifier.
+The CSV is streamed in categorical chunks (ingest.py) and encoded with
+integer code arrays, so the per-column ``fit_transform`` passes over
+string columns are gone::
+
+    python train.py                                   # LogisticRegression, like the notebook (one core)
+    python train.py --model forest --n-jobs -1        # RandomForest on all cores
+    python train.py --warm-start --add-estimators 100 # grow the current forest on new rows
+
+The four pickles and a ``artifacts_version.json`` stamp are written to
+temporary files and moved into place with ``os.replace``, stamp first. The
+stamp lists each pickle's sha1, so ``artifacts.load_artifacts`` can tell a
+half-replaced set and re-read it.
+
+A warm start only holds out rows appended since the run that wrote the
+current model (the stamp records how much of dataset.csv it saw), so
+``test_accuracy`` stays a held-out figure; it is null with ``test_rows``
+0 when nothing new was appended.
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from artifacts import ARTIFACT_FILES, BASE_DIR, PICKLE_DIR, VERSION_FILE, ModelBundle, load_artifacts
+from cleaning import build_weight_table
+from inference import MISSING_LABEL
+from ingest import DEFAULT_CHUNKSIZE, file_digest, peak_rss_mb, read_chunks
+
+
+class LabelCodes:
+    """Integer codes for one column, accumulated chunk by chunk.
+
+    Labels get provisional ids in order of first appearance; ``finish``
+    renumbers them in sorted order, which is what LabelEncoder.fit produces.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._chunks = []
+
+    def add(self, column):
+        categories = [str(c) for c in column.cat.categories] + [MISSING_LABEL]
+        ids = np.array([self._ids.setdefault(c, len(self._ids)) for c in categories], dtype=np.int32)
+        codes = column.cat.codes.to_numpy()
+        self._chunks.append(ids[codes])  # code -1 picks the trailing MISSING_LABEL
+
+    def finish(self):
+        provisional = np.concatenate(self._chunks) if self._chunks else np.zeros(0, dtype=np.int32)
+        labels = np.array(list(self._ids), dtype=object)
+        # MISSING_LABEL is always registered; keep it only if some cell was empty
+        present = np.bincount(provisional, minlength=len(labels)) > 0
+        order = np.array(sorted(np.flatnonzero(present), key=lambda i: labels[i]), dtype=np.int64)
+        remap = np.full(len(labels), -1, dtype=np.int64)
+        remap[order] = np.arange(len(order))
+        return labels[order], remap[provisional]
+
+
+def _label_encoder(classes):
+    from sklearn.preprocessing import LabelEncoder
+
+    encoder = LabelEncoder()
+    encoder.classes_ = np.asarray(classes, dtype=object)
+    return encoder
+
+
+def load_encoded(dataset_path, chunksize=DEFAULT_CHUNKSIZE):
+    """Encode dataset.csv into (X codes, y codes, symptom encoders, disease encoder, columns)."""
+    columns = None
+    codes = {}
+    for chunk in read_chunks(dataset_path, chunksize):
+        if columns is None:
+            columns = list(chunk.columns)
+            codes = {c: LabelCodes() for c in columns}
+        for column in columns:
+            codes[column].add(chunk[column])
+
+    disease_classes, y = codes['Disease'].finish()
+    X_columns = pd.Index([c for c in columns if c != 'Disease'])
+    symptom_encoders, X = {}, []
+    for column in X_columns:
+        classes, column_codes = codes[column].finish()
+        symptom_encoders[column] = _label_encoder(classes)
+        X.append(column_codes)
+    return np.column_stack(X), y, symptom_encoders, _label_encoder(disease_classes), X_columns
+
+
+def unknown_symptoms(symptom_encoders, df_weights):
+    # labels that the clean_data rules (strip, known misspellings) don't recognise
+    weights = build_weight_table(df_weights)
+    labels = {label.strip() for encoder in symptom_encoders.values() for label in encoder.classes_}
+    return sorted(labels - set(weights.index) - {MISSING_LABEL})
+
+
+def build_model(kind, n_jobs, seed, n_estimators):
+    if kind == "forest":
+        from sklearn.ensemble import RandomForestClassifier
+
+        # hyperparameters from Disease_symptoms_classification.ipynb
+        return RandomForestClassifier(n_estimators=n_estimators, max_depth=20, min_samples_split=2,
+                                      min_samples_leaf=1, random_state=seed, n_jobs=n_jobs)
+    from sklearn.linear_model import LogisticRegression
+
+    # lbfgs fits the multinomial model on one core; n_jobs would be ignored
+    return LogisticRegression(max_iter=1000)
+
+
+def write_artifacts(bundle, out_dir, stamp):
+    """Dump the four pickles and the version stamp, each moved into place atomically.
+
+    The files are replaced one after another, so the stamp records each
+    pickle's sha1. It is written after the pickles but moved into place
+    first, which keeps it newer than every pickle while the swap runs;
+    load_artifacts re-reads until they agree.
+    """
+    import joblib
+
+    os.makedirs(out_dir, exist_ok=True)
+    objects = {name: getattr(bundle, field) for field, name in ARTIFACT_FILES.items()}
+    staged = []
+    try:
+        for name, obj in objects.items():
+            fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", dir=out_dir)
+            os.close(fd)
+            joblib.dump(obj, tmp_path)
+            staged.append((tmp_path, os.path.join(out_dir, name)))
+        stamp["files"] = {name: file_digest(tmp_path) for (tmp_path, _), name in zip(staged, objects)}
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{VERSION_FILE}.", dir=out_dir)
+        with os.fdopen(fd, "w") as f:
+            json.dump(stamp, f, indent=2)
+        staged.append((tmp_path, os.path.join(out_dir, VERSION_FILE)))
+    except BaseException:
+        for tmp_path, _ in staged:
+            os.remove(tmp_path)
+        raise
+    # the version stamp goes first: a reader that sees the new stamp next to
+    # old pickles waits instead of taking the old stamp for a stale one
+    for tmp_path, path in staged[-1:] + staged[:-1]:
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+
+
+class PhaseTimer:
+    def __init__(self):
+        self.phases = {}
+
+    @contextlib.contextmanager
+    def __call__(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+
+def _seen_rows(out_dir, dataset_path):
+    """Rows of dataset.csv the model in ``out_dir`` was trained on, or None.
+
+    Only known when its stamp still describes the pickles and dataset.csv
+    has since only grown by appended rows.
+    """
+    try:
+        with open(os.path.join(out_dir, VERSION_FILE)) as f:
+            stamp = json.load(f)
+        files = stamp["files"]
+        size = stamp["dataset_bytes"]
+        if os.path.getsize(dataset_path) < size or file_digest(dataset_path, size) != stamp["dataset_sha1"]:
+            return None
+        if any(file_digest(os.path.join(out_dir, name)) != files.get(name) for name in ARTIFACT_FILES.values()):
+            return None
+        return int(stamp["rows"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def train(dataset_path, severity_path, out_dir=PICKLE_DIR, model_kind="logistic", n_jobs=-1,
+          seed=42, test_size=0.3, n_estimators=300, warm_start=False, add_estimators=100,
+          chunksize=DEFAULT_CHUNKSIZE, bundle_dir=None):
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import train_test_split
+
+    timer = PhaseTimer()
+    wall_start = time.perf_counter()
+
+    with timer("encode"):
+        if warm_start:
+            # keep the current encoders so existing trees/coefficients stay valid;
+            # labels they have never seen encode to -1, as at prediction time
+            from inference import SymptomEncoderTable
+
+            current = load_artifacts(out_dir)
+            seen = _seen_rows(out_dir, dataset_path)
+            table = SymptomEncoderTable.from_encoders(current.symptom_encoders, current.X_columns)
+            X, diseases = [], []
+            for chunk in read_chunks(dataset_path, chunksize):
+                raw = chunk[list(current.X_columns)].astype(object)
+                X.append(table.encode_many(raw.where(raw.notna(), MISSING_LABEL).to_numpy()))
+                diseases.append(chunk["Disease"].astype(object).to_numpy())
+            X, diseases = np.concatenate(X), np.concatenate(diseases)
+            unseen = set(diseases) - set(current.disease_encoder.classes_)
+            if unseen:
+                raise ValueError(f"cannot warm-start with new diseases {sorted(unseen)}; retrain from scratch")
+            y = current.disease_encoder.transform(diseases)
+            symptom_encoders, disease_encoder = current.symptom_encoders, current.disease_encoder
+            X_columns = current.X_columns
+        else:
+            X, y, symptom_encoders, disease_encoder, X_columns = load_encoded(dataset_path, chunksize)
+    unknown = unknown_symptoms(symptom_encoders, pd.read_csv(severity_path))
+
+    X = pd.DataFrame(X, columns=X_columns)
+    if not warm_start:
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=seed)
+    else:
+        # the existing trees/coefficients have seen an unknown part of the old
+        # rows, so only rows appended since the last run can be held out
+        appended = np.arange(seen if seen is not None else len(X), len(X))
+        test_rows = np.array([], dtype=int)
+        if len(appended) * test_size >= 1:
+            appended, test_rows = train_test_split(appended, test_size=test_size, random_state=seed)
+        train_rows = np.setdiff1d(np.arange(len(X)), test_rows)
+        X_train, X_test, y_train, y_test = X.iloc[train_rows], X.iloc[test_rows], y[train_rows], y[test_rows]
+
+    with timer("fit"):
+        if warm_start:
+            model = current.model
+            model.set_params(warm_start=True)
+            if hasattr(model, "n_estimators"):
+                model.set_params(n_estimators=model.n_estimators + add_estimators)
+            if "n_jobs" in model.get_params():
+                model.set_params(n_jobs=n_jobs)
+        else:
+            model = build_model(model_kind, n_jobs, seed, n_estimators)
+        model.fit(X_train, y_train)
+
+    with timer("evaluate"):
+        # None when a warm start had no new rows to hold out
+        accuracy = accuracy_score(y_test, model.predict(X_test)) if len(X_test) else None
+
+    import sklearn
+
+    dataset_bytes = os.path.getsize(dataset_path)
+    stamp = {
+        "version": datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%d%H%M%S"),
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "dataset": os.path.relpath(os.path.abspath(dataset_path), BASE_DIR),
+        "dataset_bytes": dataset_bytes,
+        "dataset_sha1": file_digest(dataset_path, dataset_bytes),
+        "rows": int(len(X)),
+        "model": type(model).__name__,
+        "warm_start": warm_start,
+        "params": {k: v for k, v in model.get_params().items()
+                   if isinstance(v, (int, float, str, bool, type(None)))},
+        "test_accuracy": round(float(accuracy), 4) if accuracy is not None else None,
+        "test_rows": int(len(X_test)),
+        "sklearn": sklearn.__version__,
+        "unknown_symptoms": unknown,
+    }
+    bundle = ModelBundle(model, symptom_encoders, disease_encoder, X_columns)
+    with timer("write"):
+        write_artifacts(bundle, out_dir, stamp)
+        if bundle_dir:
+            from model_bundle import write_bundle
+
+            write_bundle(bundle, bundle_dir)
+
+    stamp["timings_s"] = {k: round(v, 3) for k, v in timer.phases.items()}
+    stamp["wall_time_s"] = round(time.perf_counter() - wall_start, 3)
+    stamp["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    return stamp
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", default=os.path.join(BASE_DIR, "dataset.csv"))
+    parser.add_argument("--severity", default=os.path.join(BASE_DIR, "Symptom-severity.csv"))
+    parser.add_argument("--out", default=PICKLE_DIR, help="directory for the four pickles")
+    parser.add_argument("--model", choices=["logistic", "forest"], default="logistic")
+    parser.add_argument("--n-jobs", type=int, default=-1,
+                        help="cores for --model forest (-1 = all); the default logistic model uses one")
+    parser.add_argument("--n-estimators", type=int, default=300)
+    parser.add_argument("--warm-start", action="store_true",
+                        help="continue from the model in --out instead of training from scratch; "
+                             "only rows appended since that run are held out for test_accuracy")
+    parser.add_argument("--add-estimators", type=int, default=100,
+                        help="trees to add to a warm-started forest")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--test-size", type=float, default=0.3)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--bundle", help="also write a memory-mapped model bundle here")
+    args = parser.parse_args(argv)
+
+    stamp = train(args.dataset, args.severity, args.out, args.model, args.n_jobs, args.seed,
+                  args.test_size, args.n_estimators, args.warm_start, args.add_estimators,
+                  args.chunksize, args.bundle)
+    print(json.dumps(stamp, indent=2))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import functools
+
+import plotly.graph_objects as go
+import plotly_express as px
+
+import numpy as np
+
+from analytics import AnalyticsCube
+from instrumentation import span
+
+# Render budget: points sent per scatter trace, and JSON bytes per page
+DEFAULT_MAX_POINTS_PER_TRACE = 2000
+PAGE_PAYLOAD_BUDGET = 1_000_000
+
+
+def payload_size(fig):
+    # bytes of the JSON spec shipped to the browser for this figure
+    return len(fig.to_json())
+
+
+def payload_sizes(figures):
+    return [payload_size(fig) for fig in figures]
+
+
+def binned_points(cube, max_points=DEFAULT_MAX_POINTS_PER_TRACE):
+    """One WebGL point per (disease, weight) bin, sized by how many cells fall in it.
+
+    Stands in for ``points='all'``: the trace grows with the number of
+    distinct bins, not rows, and keeps the ``max_points`` most populated.
+    """
+    disease_idx, weights = np.nonzero(cube.disease_hist)
+    counts = cube.disease_hist[disease_idx, weights]
+    if len(counts) > max_points:
+        keep = np.sort(np.argsort(counts, kind='stable')[::-1][:max_points])
+        disease_idx, weights, counts = disease_idx[keep], weights[keep], counts[keep]
+
+    size = 4 + 16 * np.sqrt(counts / counts.max()) if len(counts) else counts
+    return go.Scattergl(x=np.array(cube.diseases, dtype=object)[disease_idx],
+                        y=weights,
+                        mode='markers',
+                        marker=dict(size=size, color='rgba(60, 60, 60, 0.5)'),
+                        customdata=counts,
+                        hovertemplate='%{x}<br>Presence %{y}: %{customdata} cells<extra></extra>',
+                        name='Binned points',
+                        showlegend=False)
+
+
+def visualize_data(df_cleaned, points='binned', max_points_per_trace=DEFAULT_MAX_POINTS_PER_TRACE):
+    with span("figure:cube"):
+        cube = AnalyticsCube.from_frame(df_cleaned)
+    return visualize_cube(cube, points, max_points_per_trace)
+
+
+# Plotting symptom counts
+def symptom_counts_figure(cube):
+    symptom_counts = cube.value_counts()
+    return px.bar(symptom_counts, 
+                  x=symptom_counts.values, 
+                  y=symptom_counts.index, 
+                  labels={'x': 'Count', 'y': 'Symptoms'}, 
+                  title='Top Symptoms Counts', 
+                  orientation='h')
+
+
+# Visualizing the distribution of symptoms across the dataset
+def symptom_distribution_figure(cube):
+    symptoms_stack = cube.value_counts()
+    return px.bar(symptoms_stack, 
+                  x=symptoms_stack.index, 
+                  y=symptoms_stack.values, 
+                  labels={'x': 'Symptoms', 'y': 'Count'}, 
+                  title='Distribution of Symptoms')
+
+
+def disease_distribution_figure(cube):
+    disease_counts = cube.disease_counts()
+    return px.pie(disease_counts, 
+                  values=disease_counts.values, 
+                  names=disease_counts.index, 
+                  title='Distribution of Diseases')
+
+
+# Box plot of symptoms by disease, from per-disease weight histograms
+def disease_box_figure(cube, points='binned', max_points_per_trace=DEFAULT_MAX_POINTS_PER_TRACE):
+    box_stats = cube.disease_box_stats()
+
+    fig = go.Figure([go.Box(name=row.Disease,
+                            x=[row.Disease],
+                            q1=[row.q1],
+                            median=[row.median],
+                            q3=[row.q3],
+                            lowerfence=[row.lowerfence],
+                            upperfence=[row.upperfence],
+                            mean=[row.mean])
+                     for row in box_stats.itertuples()])
+    if points == 'binned':
+        fig.add_trace(binned_points(cube, max_points_per_trace))
+    fig.update_layout(title='Symptom Distribution by Disease',
+                      xaxis_title='Disease',
+                      yaxis_title='Presence',
+                      legend_title_text='Disease')
+    return fig
+
+
+# Heatmap of symptom correlation
+def correlation_figure(cube):
+    symptoms_corr = cube.corr()
+    return px.imshow(symptoms_corr,
+                     labels=dict(x="Symptoms", y="Symptoms", color="Correlation"),
+                     x=symptoms_corr.index,
+                     y=symptoms_corr.columns,
+                     title='Symptom Correlation Heatmap')
+
+
+# in the order the Data page shows them; names are used for timing spans
+FIGURES = {
+    'symptom_counts': symptom_counts_figure,
+    'symptom_distribution': symptom_distribution_figure,
+    'disease_distribution': disease_distribution_figure,
+    'disease_box': disease_box_figure,
+    'correlation': correlation_figure,
+}
+
+
+def visualize_cube(cube, points='binned', max_points_per_trace=DEFAULT_MAX_POINTS_PER_TRACE):
+    # Every chart is drawn from the pre-aggregated cube, never the raw rows
+    builders = dict(FIGURES, disease_box=functools.partial(
+        disease_box_figure, points=points, max_points_per_trace=max_points_per_trace))
+    figures = []
+    for name, build in builders.items():
+        with span(f"figure:{name}"):
+            figures.append(build(cube))
+    return tuple(figures)
@@ -1,10 +1,13 @@
+import json
 import os
+import time
 import streamlit as st
-import pandas as pd
-import joblib
-import plotly_express as px
-from PIL import Image
 from streamlit_option_menu import option_menu
+from caching import (load_datasets, load_figure_payload_sizes, load_figures, load_model_bundle,
+                     load_predictor, load_search_index, warm_model_bundle)
+import instrumentation
+
+script_start = time.perf_counter()
 
 st.set_page_config(page_title="Health Hunch",
                    layout="wide",
@@ -13,15 +16,12 @@ st.set_page_config(page_title="Health Hunch",
 # getting the working directory of the main.py
 working_dir = os.path.dirname(os.path.abspath(__file__))
 
-model = joblib.load("pickle files/model.pkl")
-symptom_encoders = joblib.load("pickle files/symptom_encoder.pkl")
-disease_encoder = joblib.load("pickle files/disease_encoder.pkl")
-X_columns = joblib.load("pickle files/X_column.pkl")
+# Start loading the model in the background; only Self-Diagnosis waits for it
+warm_model_bundle()
 
-image = Image.open("logo.png")
 col1, col2 = st.columns([0.4,0.5])
 with col1:
-    st.image(image,width=350)
+    st.image("logo.png",width=350)
 
 html_title = """
     <style>
@@ -52,96 +52,14 @@ with st.sidebar:
                            icons=['activity', 'clipboard2-data-fill', 'graph-up-arrow'],
                            default_index=0)
 
-def clean_data(df, df1):
-    col = df.columns
-    data = df[col].values.flatten()
-
-    s = pd.Series(data)
-    s = s.str.strip()
-    s = s.values.reshape(df.shape)
-
-    df = pd.DataFrame(s, columns=df.columns)
-    df = df.fillna(0)
-    
-    col = df.columns
-    vals = df.values
-    symptoms = df1['Symptom'].unique()
-
-    for i in range(len(symptoms)):
-        vals[vals == symptoms[i]] = df1[df1['Symptom'] == symptoms[i]]['weight'].values[0]
-
-    d = pd.DataFrame(vals, columns=col)
-    d = d.replace('dischromic _patches', 0)
-    d = d.replace('spotting_ urination', 0)
-    df_cleaned = d.replace('foul_smell_of urine', 0)
-    
-    return df_cleaned
-
-def visualize_data(df_cleaned):
-    col = df_cleaned.columns
-    # Plotting symptom counts
-    symptoms = df_cleaned.drop(columns=['Disease'])
-    symptom_counts = symptoms.apply(pd.value_counts).sum(axis=1)
-    symptom_counts = symptom_counts.sort_values(ascending=False)
-
-    fig1 = px.bar(symptom_counts, 
-                  x=symptom_counts.values, 
-                  y=symptom_counts.index, 
-                  labels={'x': 'Count', 'y': 'Symptoms'}, 
-                  title='Top Symptoms Counts', 
-                  orientation='h')
-    
-    # Visualizing the distribution of symptoms across the dataset
-    symptoms_stack = symptoms.stack().value_counts()
-    fig2 = px.bar(symptoms_stack, 
-                  x=symptoms_stack.index, 
-                  y=symptoms_stack.values, 
-                  labels={'x': 'Symptoms', 'y': 'Count'}, 
-                  title='Distribution of Symptoms')
-    
-    disease_counts = df_cleaned['Disease'].value_counts()
-    
-    fig3 = px.pie(disease_counts, 
-                  values=disease_counts.values, 
-                  names=disease_counts.index, 
-                  title='Distribution of Diseases')
-    
-    # Box plot of symptoms by disease
-    df_melted = pd.melt(df_cleaned, id_vars=['Disease'], value_vars=df_cleaned.columns[1:], 
-                        var_name='Symptom', value_name='Presence')
-    
-    fig4 = px.box(df_melted, 
-                  x='Disease', 
-                  y='Presence', 
-                  color='Disease', 
-                  points='all', 
-                  title='Symptom Distribution by Disease')
-    
-    # Heatmap of symptom correlation
-    symptoms_corr = df_cleaned.drop(columns=['Disease']).corr()
-
-    fig5 = px.imshow(symptoms_corr,
-                     labels=dict(x="Symptoms", y="Symptoms", color="Correlation"),
-                     x=symptoms_corr.index,
-                     y=symptoms_corr.columns,
-                     title='Symptom Correlation Heatmap')
-    
-    return fig1, fig2, fig3, fig4, fig5
-
 def predict_disease(symptoms):
-    new_data = pd.DataFrame([symptoms], columns=X_columns)
-
-    # Encode new instance using pre-fitted encoders
-    for column in new_data.columns:
-        if column in symptom_encoders:
-            encoder = symptom_encoders[column]
-            # Handle unknown labels with a default value
-            new_data[column] = new_data[column].apply(lambda x: encoder.transform([x])[0] if x in encoder.classes_ else -1)
+    # Encoders are precompiled into a lookup table; unknown labels still map to -1
+    return load_predictor().predict(symptoms)
 
-    predicted_label = model.predict(new_data)
-    predicted_disease = disease_encoder.inverse_transform(predicted_label)[0]
 
-    return predicted_disease
+def differential_diagnosis(symptoms, k=5):
+    # predict_proba-ranked diseases; repeated symptom combinations hit the LRU memo
+    return load_predictor().top_k(symptoms, k)
 
 
 if selected == "About":
@@ -172,7 +90,7 @@ if selected == "About":
     with col4:
         st.header("Key Features")
         st.markdown("""
-                    - **Symptom Checker:** Easily search for symptoms by selecting the first letter of the symptom. Get detailed descriptions and information about each symptom to better understand potential health issues.
+                    - **Symptom Checker:** Easily search for symptoms by typing part of a name or selecting the first letter of the symptom. Get detailed descriptions and information about each symptom to better understand potential health issues.
                     - **Disease Information:** Access an extensive database of diseases and conditions. Learn about the causes, symptoms, and treatment options for various health conditions.
                     - **User-Friendly Interface:** The dashboard is designed with a clean, intuitive interface, making it easy for users of all ages to navigate and find the information they need.
                     - **Visual Analytics:** Utilize visual analytics to see trends and patterns in symptoms and diseases. This can help in identifying common health issues and understanding the spread and prevalence of certain conditions.""")
@@ -183,7 +101,7 @@ if selected == "About":
     
     with col7:
         st.header("How It Works")
-        st.markdown("""**Search Symptoms:** Use the alphabetical buttons to search for symptoms by their first letter. Click on any letter to see a list of symptoms starting with that letter along with detailed descriptions.""")
+        st.markdown("""**Search Symptoms:** Type a symptom or disease (misspellings are fine) or use the alphabetical buttons to search for symptoms by their first letter. Click on any letter to see a list of symptoms starting with that letter along with detailed descriptions.""")
         st.markdown("""
                     - Our Symptom Checker allows you to quickly and easily search for symptoms by their first letter. The intuitive alphabetical navigation helps you locate symptoms without needing to know their exact spelling.
                     - Once you click on a letter, you will be presented with a list of symptoms that start with that letter. Each symptom is accompanied by a detailed description, including common causes and associated conditions.
@@ -224,34 +142,35 @@ if selected == "About":
                     - Support for Healthcare Decisions""")
         st.markdown(""" """)
     
-    symptoms_data = {
-        "A": ["Asthma - is an inflammatory disorder of the airways, characterized by periodic attacks of wheezing, shortness of breath, chest tightness, and coughing.", "Abdominal pain - it may be felt anywhere between the bottom of your rib cage and your groin", "Acne - is a skin condition that is common in adolescents.", "Abscess - is an area under the skin where pus (infected fluid) collects.", "Allergies - are an immune system reaction to a substance called an allergen.","Anemia - is a low number of red blood cells or a low amount of hemoglobin in your red blood cells.", "Anxiety - is a condition that causes you to feel extremely worried or nervous.", "Arthritis - is pain or disease in one or more joints."],
-        "B": ["Bronchitis - is a type of infection that affects your lungs.", "Bacterial Infection - Some bacteria cause disease in man, requiring treatment with an antibiotic.", "Blister - is a fluid-filled pocket on the surface of your skin.", "Botulism - is a rare but serious illness that attacks your nerves. Toxins (poison) from bacteria called Clostridium botulinum get into your bloodstream and attack your nerves.", "Bursitis - is inflammation of a bursa, a membrane-lined sac near a joint that acts as a cushion between the muscle and bone.", "Blurred Vision - is when you cannot see fine details.", "Bipolar Disorder - is a long-term chemical imbalance that causes rapid changes in mood and behavior.", "Bladder Infection - Inflammation of the urinary bladder.", "Bunion - is a bony lump at the base of your big toe. "],
-        "C": ["Chronic Cough - is a cough that lasts more than 4 weeks in children or 8 weeks in adults.", "Cellulitis - is a skin infection caused by bacteria.", "Chronic Pain - is pain that does not get better for 3 months or longer.", "Cancer - is not a single disease. It's a group of diseases characterized by their ability to cause cells to change abnormally and grow out of control.", "COPD (Chronic Obstructive Pulmonary Disease) - is a long-term respiratory condition that often requires several different medications to control it, such as bronchodilators (short-acting or long-acting), corticosteroids, mucolytics, or antibiotics.", "Cirrhosis - is a disease in which normal liver cells are replaced by scar tissue, which interferes with all of these important functions. ", "Cold Symptoms - A cold is an infection caused by a virus. The infection causes your upper respiratory system to become inflamed. Common symptoms of a cold include sneezing, dry throat, a stuffy nose, headache, watery eyes, and a cough.", "Common Cold -  also called viral rhinitis, is one of the most common infectious diseases in humans.", "Constipation - means you have hard, dry bowel movements, or you go longer than usual between bowel movements.", "Concussion - is a mild brain injury.", "Chronic Back Pain - is back pain that lasts 3 months or longer."],
-        "D": ["Diabetes Type1 - is a lifelong disorder caused by an autoimmune attack on the insulin-producing cells of the pancreas, which means the pancreas produces little or no insulin.", "Diabetes Type2 - Noninsulin-dependent Diabetes", "Dementia - is a condition that causes loss of memory, thought control, and judgment.", "Depression - is a mood disorder that causes feelings of sadness or hopelessness that do not go away.", "Diarrhea - is more frequent and more liquid bowel movements than normal.", "Dermatitis - is skin inflammation.", "Dermal Ulcer - is a skin sore with breakdown of tissue which may lead to a loss of epidermis, dermis or subcutaneous fat."],
-        "E": ["Eczema - is an itchy, red, scaly skin rash.", "Edema - is swelling throughout your body, a sign that you are retaining fluid", "Eating Disorders - it include extreme emotions, attitudes, and behaviors surrounding weight and food issues.", "Elbow Sprain - is caused by a stretched or torn ligament in the elbow joint", "Emphysema - is a long-term lung disease", "Encephalitis - is inflammation of the brain", "Epilepsy - is a brain disorder that causes seizures", "Esophagitis - is inflammation or irritation of the lining of the esophagus"],
-        "F": ["Flu - is a common infectious viral illness.", "Fever - normal body temperature is approximately 37°C. A fever is usually when your body temperature is 37.8°C or higher. You may feel warm, cold or shivery.", "Fibroids - are non-cancerous growths that develop in the muscular wall of the womb (uterus).", "Food Allergy - is when the body's immune system reacts unusually to specific foods. Although allergic reactions are often mild, they can be very serious.", "Functional neurological disorder (FND) - describes a problem with how the brain receives and sends information to the rest of the body."],
-        "G": ["Gastritis - is inflammation or irritation of the lining of your stomach.", "Gastric Ulcer - are small holes or erosions that occur in the lining of your stomach.", "Gangrene - is a condition that happens when tissue dies.", "Galactosemia - is the inability of the body to use (metabolize) the simple sugar galactose (causing the accumulation of galactose 1-phosphate), which then reaches high levels in the body, causing damage to the liver, central nervous system, and various other body systems.", "GERD - Gastroesophageal reflux disease (GERD) is when food or liquid travels from the stomach back up into the esophagus.", "Goiter - is an enlargement of the thyroid gland.", "Glaucoma - is an eye disease that causes vision loss in one or both eyes"],
-        "H": ["Hypertension - There needs to be a certain level of pressure in the arteries to move blood around the body. But, if blood pressure is higher than recommended over time it increases the risk of cardiovascular diseases like stroke or heart attack.", "HIV (human immunodeficiency virus) - The virus targets the immune system and if untreated, weakens your ability to fight infections and disease.", "Hiatus hernia - is when part of the stomach squeezes up into the chest through an opening (‘hiatus’) in the diaphragm.", "Heart Disease", "Hepatitis A - is a liver infection that’s spread in the poo of an infected person.", "Hepatitis B - is a liver infection that’s spread through blood and body fluids. ", "Headaches - Most headaches are not serious."],
-        "I": ["Influenza", "Insomnia - can be both struggling to get to sleep or difficulty staying asleep", "Iron deficiency anaemia - is a condition where a lack of iron in the body leads to a reduction in the number of red blood cells.", "Itching - is an unpleasant sensation that compels a person to scratch the affected area.", "Indigestion - can be pain or discomfort in your upper abdomen (dyspepsia) or burning pain behind the breastbone (heartburn)."],
-        "J": ["Jaundice"],
-        "K": ["Kidney Stones - can develop in one or both kidneys and most often affect people aged 30 to 60.", "Kaposi’s sarcoma - is a rare type of cancer caused by a virus. It can affect the skin and internal organs.", "Kidney cancer - can include blood in your urine, a constant pain in your side, just below the ribs, a lump or swelling in the kidney area (on either side of the body)"],
-        "L": ["Low blood pressure – sometimes referred to as hypotension, is a condition where the arterial blood pressure is abnormally low. Blood pressure is a measure of the force that your heart uses to pump blood around your body. ", "Lupus - is a complex and poorly understood condition that affects many parts of the body and causes symptoms ranging from mild to life-threatening.", "Labyrinthitis - is an inner ear infection. It causes the labyrinth inside your ear to become inflamed, affecting your hearing and balance.", "Lactose intolerance - is a common digestive problem where the body is unable to digest lactose, a type of sugar mainly found in milk and dairy products.", "Leg cramps - are a common and usually harmless condition. They cause the muscles in your leg to suddenly become tight and painful.", "Lymphoedema - is a chronic (long-term) condition that causes swelling in the body’s tissues. It can affect any part of the body, but usually develops in the arms or legs."],
-        "M": ["Migraine - is a common health condition. It affects around 1 in every 5 women and around 1 in every 15 men. It usually begins in early adulthood.", "Malnutrition - means poor nutrition. Most commonly this is caused by not eating enough (undernutrition) or not eating enough of the right food to give your body the nutrients it needs.", "Malignant brain tumour - is a fast-growing cancer that spreads to other areas of the brain and spine.", "Mouth ulcers - are painful sores that appear in the mouth. They’re uncomfortable but they’re usually harmless."],
-        "N": ["Narcolepsy"],
-        "O": ["Osteoporosis"],
-        "P": ["Pneumonia"],
-        "Q": ["Q Fever"],
-        "R": ["Rheumatoid Arthritis"],
-        "S": ["Sinusitis"],
-        "T": ["Tuberculosis"],
-        "U": ["Ulcer"],
-        "V": ["Vertigo"],
-        "W": ["Whooping Cough"],
-        "X": ["Xerosis"],
-        "Y": ["Yellow Fever"],
-        "Z": ["Zika Virus"],
-    }
+    # curated descriptions, merged into the search index built from the CSVs
+    curated_conditions = (
+        "Asthma - is an inflammatory disorder of the airways, characterized by periodic attacks of wheezing, shortness of breath, chest tightness, and coughing.", "Abdominal pain - it may be felt anywhere between the bottom of your rib cage and your groin", "Acne - is a skin condition that is common in adolescents.", "Abscess - is an area under the skin where pus (infected fluid) collects.", "Allergies - are an immune system reaction to a substance called an allergen.","Anemia - is a low number of red blood cells or a low amount of hemoglobin in your red blood cells.", "Anxiety - is a condition that causes you to feel extremely worried or nervous.", "Arthritis - is pain or disease in one or more joints.",
+        "Bronchitis - is a type of infection that affects your lungs.", "Bacterial Infection - Some bacteria cause disease in man, requiring treatment with an antibiotic.", "Blister - is a fluid-filled pocket on the surface of your skin.", "Botulism - is a rare but serious illness that attacks your nerves. Toxins (poison) from bacteria called Clostridium botulinum get into your bloodstream and attack your nerves.", "Bursitis - is inflammation of a bursa, a membrane-lined sac near a joint that acts as a cushion between the muscle and bone.", "Blurred Vision - is when you cannot see fine details.", "Bipolar Disorder - is a long-term chemical imbalance that causes rapid changes in mood and behavior.", "Bladder Infection - Inflammation of the urinary bladder.", "Bunion - is a bony lump at the base of your big toe. ",
+        "Chronic Cough - is a cough that lasts more than 4 weeks in children or 8 weeks in adults.", "Cellulitis - is a skin infection caused by bacteria.", "Chronic Pain - is pain that does not get better for 3 months or longer.", "Cancer - is not a single disease. It's a group of diseases characterized by their ability to cause cells to change abnormally and grow out of control.", "COPD (Chronic Obstructive Pulmonary Disease) - is a long-term respiratory condition that often requires several different medications to control it, such as bronchodilators (short-acting or long-acting), corticosteroids, mucolytics, or antibiotics.", "Cirrhosis - is a disease in which normal liver cells are replaced by scar tissue, which interferes with all of these important functions. ", "Cold Symptoms - A cold is an infection caused by a virus. The infection causes your upper respiratory system to become inflamed. Common symptoms of a cold include sneezing, dry throat, a stuffy nose, headache, watery eyes, and a cough.", "Common Cold -  also called viral rhinitis, is one of the most common infectious diseases in humans.", "Constipation - means you have hard, dry bowel movements, or you go longer than usual between bowel movements.", "Concussion - is a mild brain injury.", "Chronic Back Pain - is back pain that lasts 3 months or longer.",
+        "Diabetes Type1 - is a lifelong disorder caused by an autoimmune attack on the insulin-producing cells of the pancreas, which means the pancreas produces little or no insulin.", "Diabetes Type2 - Noninsulin-dependent Diabetes", "Dementia - is a condition that causes loss of memory, thought control, and judgment.", "Depression - is a mood disorder that causes feelings of sadness or hopelessness that do not go away.", "Diarrhea - is more frequent and more liquid bowel movements than normal.", "Dermatitis - is skin inflammation.", "Dermal Ulcer - is a skin sore with breakdown of tissue which may lead to a loss of epidermis, dermis or subcutaneous fat.",
+        "Eczema - is an itchy, red, scaly skin rash.", "Edema - is swelling throughout your body, a sign that you are retaining fluid", "Eating Disorders - it include extreme emotions, attitudes, and behaviors surrounding weight and food issues.", "Elbow Sprain - is caused by a stretched or torn ligament in the elbow joint", "Emphysema - is a long-term lung disease", "Encephalitis - is inflammation of the brain", "Epilepsy - is a brain disorder that causes seizures", "Esophagitis - is inflammation or irritation of the lining of the esophagus",
+        "Flu - is a common infectious viral illness.", "Fever - normal body temperature is approximately 37°C. A fever is usually when your body temperature is 37.8°C or higher. You may feel warm, cold or shivery.", "Fibroids - are non-cancerous growths that develop in the muscular wall of the womb (uterus).", "Food Allergy - is when the body's immune system reacts unusually to specific foods. Although allergic reactions are often mild, they can be very serious.", "Functional neurological disorder (FND) - describes a problem with how the brain receives and sends information to the rest of the body.",
+        "Gastritis - is inflammation or irritation of the lining of your stomach.", "Gastric Ulcer - are small holes or erosions that occur in the lining of your stomach.", "Gangrene - is a condition that happens when tissue dies.", "Galactosemia - is the inability of the body to use (metabolize) the simple sugar galactose (causing the accumulation of galactose 1-phosphate), which then reaches high levels in the body, causing damage to the liver, central nervous system, and various other body systems.", "GERD - Gastroesophageal reflux disease (GERD) is when food or liquid travels from the stomach back up into the esophagus.", "Goiter - is an enlargement of the thyroid gland.", "Glaucoma - is an eye disease that causes vision loss in one or both eyes",
+        "Hypertension - There needs to be a certain level of pressure in the arteries to move blood around the body. But, if blood pressure is higher than recommended over time it increases the risk of cardiovascular diseases like stroke or heart attack.", "HIV (human immunodeficiency virus) - The virus targets the immune system and if untreated, weakens your ability to fight infections and disease.", "Hiatus hernia - is when part of the stomach squeezes up into the chest through an opening (‘hiatus’) in the diaphragm.", "Heart Disease", "Hepatitis A - is a liver infection that’s spread in the poo of an infected person.", "Hepatitis B - is a liver infection that’s spread through blood and body fluids. ", "Headaches - Most headaches are not serious.",
+        "Influenza", "Insomnia - can be both struggling to get to sleep or difficulty staying asleep", "Iron deficiency anaemia - is a condition where a lack of iron in the body leads to a reduction in the number of red blood cells.", "Itching - is an unpleasant sensation that compels a person to scratch the affected area.", "Indigestion - can be pain or discomfort in your upper abdomen (dyspepsia) or burning pain behind the breastbone (heartburn).",
+        "Jaundice",
+        "Kidney Stones - can develop in one or both kidneys and most often affect people aged 30 to 60.", "Kaposi’s sarcoma - is a rare type of cancer caused by a virus. It can affect the skin and internal organs.", "Kidney cancer - can include blood in your urine, a constant pain in your side, just below the ribs, a lump or swelling in the kidney area (on either side of the body)",
+        "Low blood pressure – sometimes referred to as hypotension, is a condition where the arterial blood pressure is abnormally low. Blood pressure is a measure of the force that your heart uses to pump blood around your body. ", "Lupus - is a complex and poorly understood condition that affects many parts of the body and causes symptoms ranging from mild to life-threatening.", "Labyrinthitis - is an inner ear infection. It causes the labyrinth inside your ear to become inflamed, affecting your hearing and balance.", "Lactose intolerance - is a common digestive problem where the body is unable to digest lactose, a type of sugar mainly found in milk and dairy products.", "Leg cramps - are a common and usually harmless condition. They cause the muscles in your leg to suddenly become tight and painful.", "Lymphoedema - is a chronic (long-term) condition that causes swelling in the body’s tissues. It can affect any part of the body, but usually develops in the arms or legs.",
+        "Migraine - is a common health condition. It affects around 1 in every 5 women and around 1 in every 15 men. It usually begins in early adulthood.", "Malnutrition - means poor nutrition. Most commonly this is caused by not eating enough (undernutrition) or not eating enough of the right food to give your body the nutrients it needs.", "Malignant brain tumour - is a fast-growing cancer that spreads to other areas of the brain and spine.", "Mouth ulcers - are painful sores that appear in the mouth. They’re uncomfortable but they’re usually harmless.",
+        "Narcolepsy",
+        "Osteoporosis",
+        "Pneumonia",
+        "Q Fever",
+        "Rheumatoid Arthritis",
+        "Sinusitis",
+        "Tuberculosis",
+        "Ulcer",
+        "Vertigo",
+        "Whooping Cough",
+        "Xerosis",
+        "Yellow Fever",
+        "Zika Virus",
+    )
     st.markdown( """
         <style>
         .button {
@@ -280,12 +199,26 @@ if selected == "About":
         unsafe_allow_html=True
     )
 
-    def display_symptoms(symptom_list):
-        for symptom in symptom_list:
-            st.markdown(symptom)
+    def display_symptoms(terms):
+        for term in terms:
+            if term.description:
+                st.markdown(f"{term.label} - {term.description}")
+            else:
+                st.markdown(f"{term.label} *({term.kind})*")
 
     def main():
+        index = load_search_index(curated_conditions)
+
         st.markdown("## Search diseases & conditions")
+        query = st.text_input("Search symptoms, diseases and conditions",
+                              placeholder="Start typing, e.g. stomach pain")
+        if query:
+            matches = index.typeahead(query)
+            if matches:
+                display_symptoms(matches)
+            else:
+                st.write(f"No matches for '{query}'")
+
         st.write("You will find a currated list of symptoms and diseases in alphabetical order below:")
 
         alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
@@ -293,48 +226,66 @@ if selected == "About":
 
         rows = 6
         cols = 3
-        index = 0
+        position = 0
 
         for row in range(rows):
             cols = st.columns(5)
             for col in cols:
-                if index < len(alphabet):
-                    letter = alphabet[index]
+                if position < len(alphabet):
+                    letter = alphabet[position]
                     if col.button(letter):
                         symptoms_selected = True
-                        if letter in symptoms_data:
+                        terms = [term for term in index.prefix(letter, limit=None)
+                                 if term.key.startswith(letter.lower())]
+                        if terms:
                             st.write(f"**Symptoms starting with '{letter}':**")
-                            display_symptoms(symptoms_data[letter])
+                            display_symptoms(terms)
                         else:
                             st.write(f"No symptoms found for '{letter}'")
-                    index += 1
+                    position += 1
 
         if not symptoms_selected:
             st.write("Click on a letter to see symptoms starting with that letter.")
 
+        st.markdown("## Diseases sharing your symptoms")
+        selected = st.multiselect("Select symptoms", [term.label for term in index.symptoms()])
+        if selected:
+            shared = index.diseases_sharing(selected)
+            st.table({"Disease": [row["disease"] for row in shared],
+                      "Shared symptoms": [f"{row['shared']} of {row['of']}" for row in shared],
+                      "Records": [row["rows"] for row in shared]})
+
     if __name__ == "__main__":
         main()
 
 
 if selected == "Understanding our Data":
-    df1 = pd.read_csv("dataset.csv")
-    df2 = pd.read_csv("Symptom-severity.csv")
+    df1, df2 = load_datasets()
     
     st.markdown("#### Data visualisation in Symptoms and disease Dataset")
     st.write(df1.head(10))
     st.markdown("#### Symptom Severity Dataset")
     st.write(df2)
     
-    df_cleaned = clean_data(df1, df2)
-    # Visualize the data
-    fig1, fig2, fig3, fig4, fig5 = visualize_data(df_cleaned)
+    # Cleaned data and figures are cached across reruns
+    fig1, fig2, fig3, fig4, fig5 = load_figures()
     st.plotly_chart(fig1)
     st.plotly_chart(fig2)
     st.plotly_chart(fig3)
     st.plotly_chart(fig4)
     st.plotly_chart(fig5)
+
+    # Serialized chart sizes, checked against the per-page budget
+    from visualization import PAGE_PAYLOAD_BUDGET
+    payload = load_figure_payload_sizes()
+    if sum(payload) > PAGE_PAYLOAD_BUDGET:
+        st.warning(f"Charts on this page send {sum(payload) / 1e6:.1f} MB, "
+                   f"over the {PAGE_PAYLOAD_BUDGET / 1e6:.1f} MB budget.")
+    st.caption("Chart payloads: " + ", ".join(f"{size / 1e3:.0f} kB" for size in payload))
  
 if selected == "Self-Diagnosis":
+    model, symptom_encoders, disease_encoder, X_columns = load_model_bundle()
+
     # Symptoms List
     all_symptoms = ['skin_rash', 'itching', 'nodal_skin_eruptions', 'dischromic_patches',
                         'continuous_sneezing', 'shivering', 'chills', 'joint_pain', 'stomach_pain', 
@@ -358,8 +309,24 @@ if selected == "Self-Diagnosis":
         st.markdown("*According to the prediction, you maybe suffering from:*")
         st.success(f' {predicted_disease}')
 
-
-
-
-
-
+        with st.expander("Other possible conditions"):
+            ranked = differential_diagnosis(symptoms)
+            st.table({"Disease": [disease for disease, _ in ranked],
+                      "Probability": [f"{score:.1%}" for _, score in ranked]})
+
+
+# Opt-in timings (HEALTH_HUNCH_PROFILE=1, see instrumentation.py)
+if instrumentation.enabled():
+    instrumentation.record(f"page:{selected}", time.perf_counter() - script_start)
+    with st.sidebar.expander("Debug: timings"):
+        spans = instrumentation.snapshot()
+        st.table({"Span": list(spans),
+                  "Calls": [s["calls"] for s in spans.values()],
+                  "Mean ms": [f"{s['mean_ms']:.2f}" for s in spans.values()],
+                  "p99 ms": [f"{s['p99_ms']:.2f}" for s in spans.values()],
+                  "Max ms": [f"{s['max_ms']:.2f}" for s in spans.values()]})
+        for name, counters in instrumentation.stats().items():
+            st.markdown(f"**{name}**")
+            st.table({"Counter": list(counters), "Value": [str(v) for v in counters.values()]})
+        st.download_button("Download metrics", json.dumps(instrumentation.recorder.payload(), indent=2),
+                           file_name="health_hunch_metrics.json", mime="application/json")